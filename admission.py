@@ -0,0 +1,160 @@
+"""Admission control for analysis requests.
+
+Each analysis is admitted with an estimate of the memory it will hold,
+taken from image headers without decoding any pixels. At most cpu_slots
+analyses run at once, and their estimates may not exceed memory_budget
+bytes together. Requests beyond that wait in arrival order, up to
+max_queue of them for at most max_wait seconds; anything else is turned
+away with AdmissionRejected, which carries a Retry-After hint.
+
+Stdlib and Pillow only.
+"""
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from PIL import Image
+
+# Frame-sized copies alive at once while a frame is analyzed, all held in
+# the analyzer's buffer pool until it finishes: the BGR frame, the enhanced
+# and smoothed images, the HSV image, the gray, edge and contrast planes
+# (a third of a frame each) and the half-scale reduced set, about 5.6
+WORKING_COPIES = 6
+BYTES_PER_PIXEL = 3
+
+# Frames decoded ahead of the analyzer for each video (see video_frames)
+VIDEO_BUFFERED_FRAMES = 4 + WORKING_COPIES
+
+# Weight of the newest analysis in the running duration average
+DURATION_SMOOTHING = 0.2
+
+class AdmissionRejected(Exception):
+    """Raised when an analysis cannot be admitted; retry_after is in seconds"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+def _frame_bytes(width, height):
+    return width * height * BYTES_PER_PIXEL * WORKING_COPIES
+
+def estimate_memory(image_paths, video_paths=(), max_dimension=None):
+    """Peak bytes an analysis of these files is expected to hold.
+
+    Frames are analyzed one at a time, so the estimate follows the largest
+    image, from its header, or the buffered keyframes of a video.
+    """
+    peak = 0
+    for path in image_paths:
+        try:
+            with Image.open(path) as img:
+                width, height = img.size
+        except Exception as e:
+            print(f"Error reading image size of {path}: {e}")
+            continue
+        peak = max(peak, _frame_bytes(width, height))
+
+    if video_paths:
+        # Keyframes are scaled to max_dimension; assume 16:9 footage
+        long_side = max_dimension or 3840
+        video_bytes = long_side * (long_side * 9 // 16) * BYTES_PER_PIXEL * VIDEO_BUFFERED_FRAMES
+        peak = max(peak, video_bytes)
+
+    return peak
+
+class AdmissionController:
+    def __init__(self, memory_budget, cpu_slots, max_queue, max_wait):
+        self.memory_budget = memory_budget
+        self.cpu_slots = cpu_slots
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self._condition = threading.Condition()
+        self._waiting = deque()
+        self._in_flight = 0
+        self._memory_in_use = 0
+        self._average_duration = None
+        self._counters = {'admitted': 0, 'rejected': 0, 'timed_out': 0}
+
+    def _fits(self, cost):
+        return self._in_flight < self.cpu_slots and self._memory_in_use + cost <= self.memory_budget
+
+    def _retry_after(self, ahead):
+        """Seconds until roughly ahead more analyses have finished"""
+        duration = self._average_duration or 5.0
+        return max(1, int(round(duration * (ahead + 1) / self.cpu_slots)))
+
+    def _acquire(self, cost):
+        with self._condition:
+            if not self._waiting and self._fits(cost):
+                self._in_flight += 1
+                self._memory_in_use += cost
+                self._counters['admitted'] += 1
+                return
+
+            if len(self._waiting) >= self.max_queue:
+                self._counters['rejected'] += 1
+                raise AdmissionRejected('Analysis queue is full', self._retry_after(len(self._waiting)))
+
+            # Waiters are admitted strictly in arrival order, so a large
+            # analysis is not starved by a stream of small ones
+            ticket = object()
+            self._waiting.append(ticket)
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while not (self._waiting[0] is ticket and self._fits(cost)):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters['timed_out'] += 1
+                        raise AdmissionRejected('Timed out waiting for analysis capacity',
+                                                self._retry_after(len(self._waiting)))
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting.remove(ticket)
+                self._condition.notify_all()
+
+            self._in_flight += 1
+            self._memory_in_use += cost
+            self._counters['admitted'] += 1
+
+    def _release(self, cost, duration):
+        with self._condition:
+            self._in_flight -= 1
+            self._memory_in_use -= cost
+            if self._average_duration is None:
+                self._average_duration = duration
+            else:
+                self._average_duration += DURATION_SMOOTHING * (duration - self._average_duration)
+            self._condition.notify_all()
+
+    @contextmanager
+    def admit(self, memory_estimate):
+        """Hold a slot and memory_estimate bytes for the duration of the block.
+
+        An estimate larger than the whole budget is clamped to it, so the
+        analysis still runs, alone.
+        """
+        cost = min(memory_estimate, self.memory_budget)
+        self._acquire(cost)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(cost, time.monotonic() - started)
+
+    def gauges(self):
+        """Current load and lifetime counters"""
+        with self._condition:
+            return {
+                'in_flight': self._in_flight,
+                'queue_depth': len(self._waiting),
+                'memory_in_use_bytes': self._memory_in_use,
+                'memory_budget_bytes': self.memory_budget,
+                'cpu_slots': self.cpu_slots,
+                'max_queue': self.max_queue,
+                'average_duration_seconds': round(self._average_duration or 0.0, 2),
+                'admitted_total': self._counters['admitted'],
+                'rejected_total': self._counters['rejected'],
+                'timed_out_total': self._counters['timed_out']
+            }
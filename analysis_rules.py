@@ -0,0 +1,268 @@
+"""Category rules shared by every analysis backend.
+
+The detectors in PropertyAnalyzer (OpenCV) and LiteAnalyzer (Pillow only)
+reduce each frame to a handful of image statistics and hand them to the
+functions below, so both deployments flag the same issues for the same
+inputs. Prices, issue catalogs and severity maps come from the versioned
+cost table (see cost_tables); the thresholds that decide which issues a
+frame shows stay here. This module deliberately imports nothing heavier
+than the standard library.
+"""
+import random
+import cost_tables
+from cost_tables import SEVERITIES, COST_CATEGORIES
+
+CATEGORIES = ['roof', 'siding', 'landscaping', 'hardscaping']
+
+# Most expensive issues kept in each session's summary
+TOP_ISSUES = 10
+
+# Image enhancement applied before any statistics are taken
+CONTRAST_FACTOR = 1.2
+BRIGHTNESS_FACTOR = 1.1
+SHARPNESS_FACTOR = 1.1
+
+# Vegetation band in OpenCV HSV units (H 0-179, S/V 0-255), inclusive. The
+# histogram engine quantizes saturation and value to 8 levels per bin, so
+# S/V bounds are kept on multiples of 8 (upper bounds one below) to be
+# measured exactly.
+GREEN_HSV_LOWER = (40, 40, 40)
+GREEN_HSV_UPPER = (80, 255, 255)
+
+# Roof thresholds on the enhanced grayscale frame. Gray spread depends on
+# scale, so both builds measure it on a copy whose longest side is
+# TEXTURE_SIZE, enhanced at that size; UNEVEN_ROOF_STD applies to that copy
+DARK_ROOF_MEAN = 100
+UNEVEN_ROOF_STD = 38
+TEXTURE_SIZE = 256
+
+# Landscaping thresholds on the green coverage ratio
+LOW_VEGETATION_RATIO = 0.1
+HIGH_VEGETATION_RATIO = 0.4
+
+# Camera views, by gimbal pitch in degrees (0 is level, -90 straight down).
+# Each view only runs the detectors that can see their subject in it;
+# frames without gimbal metadata run every detector.
+NADIR_MAX_PITCH = -70
+FACADE_MIN_PITCH = -20
+VIEW_DETECTORS = {
+    'nadir': ('roof', 'landscaping', 'hardscaping'),
+    'oblique': tuple(CATEGORIES),
+    'facade': ('siding', 'landscaping', 'hardscaping'),
+    'unknown': tuple(CATEGORIES)
+}
+
+def classify_view(pitch):
+    """Camera view for a gimbal pitch, or 'unknown' without one"""
+    if pitch is None:
+        return 'unknown'
+    if pitch <= NADIR_MAX_PITCH:
+        return 'nadir'
+    if pitch >= FACADE_MIN_PITCH:
+        return 'facade'
+    return 'oblique'
+
+def _make_issue(category, template, confidence_range, table):
+    cost = random.randint(template['cost_range']['min'], template['cost_range']['max'])
+    confidence = template['confidence']
+    if confidence is None:
+        confidence = random.uniform(*confidence_range)
+    return {
+        'category': category,
+        'description': template['description'],
+        'severity': template['severity'],
+        'confidence': confidence,
+        'estimated_cost': cost,
+        'cost_range': template['cost_range'],
+        'recommendation': template['recommendation'] or table.recommendation(template['severity'])
+    }
+
+def roof_issues(mean_intensity, std_intensity, table=None):
+    """Roof issues for a frame with the given grayscale mean and std"""
+    table = table or cost_tables.current()
+    issues = []
+
+    # Darker areas might indicate damage
+    if mean_intensity < DARK_ROOF_MEAN:
+        issues.append(_make_issue('roof', table.issues['roof_dark_areas'][0], None, table))
+
+    # High variation might indicate wear
+    if std_intensity > UNEVEN_ROOF_STD:
+        issues.append(_make_issue('roof', table.issues['roof_uneven_surface'][0], None, table))
+
+    # Add 1-2 common issues for demonstration
+    for _ in range(random.randint(1, 2)):
+        issues.append(_make_issue('roof', random.choice(table.issues['roof_common']), (0.6, 0.9), table))
+
+    return issues
+
+def siding_issues(table=None):
+    """Siding issues for a frame"""
+    table = table or cost_tables.current()
+    issues = []
+    if random.random() > 0.3:  # 70% chance of finding siding issues
+        issues.append(_make_issue('siding', random.choice(table.issues['siding']), (0.5, 0.8), table))
+    return issues
+
+def landscaping_issues(green_percentage, table=None):
+    """Landscaping issues for a frame with the given green coverage ratio"""
+    table = table or cost_tables.current()
+    if green_percentage < LOW_VEGETATION_RATIO:
+        issue = table.issues['landscaping_low_vegetation'][0]
+    elif green_percentage > HIGH_VEGETATION_RATIO:
+        issue = table.issues['landscaping_high_vegetation'][0]
+    else:
+        issue = random.choice(table.issues['landscaping'])
+    return [_make_issue('landscaping', issue, (0.6, 0.85), table)]
+
+def hardscaping_issues(table=None):
+    """Hardscaping issues for a frame"""
+    table = table or cost_tables.current()
+    issues = []
+    if random.random() > 0.4:  # 60% chance
+        issues.append(_make_issue('hardscaping', random.choice(table.issues['hardscaping']), (0.55, 0.8), table))
+    return issues
+
+def categorize_issues(all_issues):
+    """Categorize issues by type"""
+    categorized = {category: [] for category in CATEGORIES}
+
+    for issue in all_issues:
+        category = issue.get('category', 'other')
+        if category in categorized:
+            categorized[category].append(issue)
+
+    return categorized
+
+def calculate_costs(categorized_issues):
+    """Calculate total costs by category"""
+    cost_breakdown = {category: 0 for category in COST_CATEGORIES}
+
+    for category, issues in categorized_issues.items():
+        if category in cost_breakdown:
+            cost_breakdown[category] = sum(issue['estimated_cost'] for issue in issues)
+
+    return cost_breakdown
+
+def calculate_condition_score(severity_counts, table=None):
+    """Calculate overall property condition score (1-10)"""
+    issue_count = sum(severity_counts.values())
+    if not issue_count:
+        return 8  # Good condition if no issues found
+
+    # Calculate score based on severity and number of issues
+    table = table or cost_tables.current()
+    total_severity = sum(table.weight(severity) * count
+                         for severity, count in severity_counts.items())
+
+    # Scale to 1-10 (higher is better)
+    max_possible_severity = issue_count * max(table.severity_weight)
+    severity_ratio = total_severity / max_possible_severity
+    score = max(1, 10 - (severity_ratio * 6))
+
+    return round(score, 1)
+
+def estimate_timeline(severity_counts, table=None):
+    """Estimate timeline in weeks for all repairs"""
+    if not sum(severity_counts.values()):
+        return 0
+
+    table = table or cost_tables.current()
+    total_weeks = sum(table.weeks(severity) * count
+                      for severity, count in severity_counts.items())
+
+    # Add some overlap consideration (reduce by 20%)
+    return max(1, int(total_weeks * 0.8))
+
+def estimate_value_increase(total_cost):
+    """Estimate property value increase from improvements"""
+    # Typical ROI for property improvements is 60-80% of investment
+    roi_multiplier = random.uniform(0.65, 0.85)
+    return int(total_cost * roi_multiplier)
+
+def calculate_roi(investment, value_increase):
+    """Calculate ROI percentage"""
+    if investment > 0:
+        return round((value_increase / investment) * 100, 1)
+    return 0
+
+def calculate_payback_period(roi_percentage):
+    """Calculate payback period in years"""
+    if roi_percentage > 0:
+        # Assuming annual appreciation/rental increase
+        annual_return = max(3, roi_percentage / 5)  # Conservative estimate
+        return round(100 / annual_return, 1)
+    return 0
+
+def build_rollup(all_issues, top_n=TOP_ISSUES):
+    """Precompute the per-session summary read by templates and reports.
+
+    A single pass over the issues yields severity counts and costs, the
+    positions of each severity's issues in issues_found, per-category cost
+    statistics and the top_n most expensive issues, so consumers never
+    have to re-scan issues_found.
+    """
+    severity_counts = {severity: 0 for severity in SEVERITIES}
+    severity_costs = {severity: 0 for severity in SEVERITIES}
+    severity_index = {severity: [] for severity in SEVERITIES}
+    category_stats = {}
+
+    for index, issue in enumerate(all_issues):
+        severity = issue['severity']
+        cost = issue['estimated_cost']
+        severity_counts[severity] = severity_counts.get(severity, 0) + 1
+        severity_costs[severity] = severity_costs.get(severity, 0) + cost
+        severity_index.setdefault(severity, []).append(index)
+
+        stats = category_stats.get(issue['category'])
+        if stats is None:
+            stats = category_stats[issue['category']] = {
+                'count': 0, 'total': 0, 'min': cost, 'max': cost,
+                'severity_counts': {s: 0 for s in SEVERITIES}
+            }
+        stats['count'] += 1
+        stats['total'] += cost
+        stats['min'] = min(stats['min'], cost)
+        stats['max'] = max(stats['max'], cost)
+        stats['severity_counts'][severity] = stats['severity_counts'].get(severity, 0) + 1
+
+    for stats in category_stats.values():
+        stats['mean'] = round(stats['total'] / stats['count'], 2)
+
+    top_issues = sorted(range(len(all_issues)),
+                        key=lambda i: all_issues[i]['estimated_cost'],
+                        reverse=True)[:top_n]
+
+    return {
+        'issue_count': len(all_issues),
+        'severity_counts': severity_counts,
+        'severity_costs': severity_costs,
+        'severity_index': severity_index,
+        'category_stats': category_stats,
+        'top_issues': [dict(all_issues[i], id=i) for i in top_issues]
+    }
+
+def build_results(all_issues, images_analyzed, table=None):
+    """Assemble the analysis results dict from the issues of every frame"""
+    table = table or cost_tables.current()
+    categorized_issues = categorize_issues(all_issues)
+    cost_breakdown = calculate_costs(categorized_issues)
+    total_cost = sum(cost_breakdown.values())
+    value_increase = estimate_value_increase(total_cost)
+    roi = calculate_roi(total_cost, value_increase)
+    summary = build_rollup(all_issues)
+
+    return {
+        'images_analyzed': images_analyzed,
+        'issues_found': all_issues,
+        'issues_by_category': categorized_issues,
+        'cost_breakdown': cost_breakdown,
+        'total_estimated_cost': total_cost,
+        'overall_condition_score': calculate_condition_score(summary['severity_counts'], table),
+        'estimated_timeline_weeks': estimate_timeline(summary['severity_counts'], table),
+        'potential_value_increase': value_increase,
+        'roi_percentage': roi,
+        'payback_years': calculate_payback_period(roi),
+        'summary': summary,
+        'cost_table_version': table.version
+    }
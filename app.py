@@ -1,12 +1,16 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify
 import os
 import json
 from datetime import datetime
 from werkzeug.utils import secure_filename
+from lite_analyzer import LiteAnalyzer
+from session_results import load_results, results_mtime, query_issues
+from report_views import reports
 import uuid
 
 app = Flask(__name__)
 app.secret_key = 'drone-analysis-secret-key-2024'
+app.register_blueprint(reports)
 app.config['UPLOAD_FOLDER'] = '/tmp/uploads' if os.environ.get('VERCEL') else 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
@@ -18,6 +22,10 @@ ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# Pillow-only analyzer: runs the same category rules as PropertyAnalyzer on a
+# small decoded proxy so it fits in the function's memory and time limits
+analyzer = LiteAnalyzer()
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -36,29 +44,69 @@ def upload_file():
             flash('No files selected')
             return redirect(request.url)
         
-        # Simple demo results (no actual AI analysis for Vercel compatibility)
-        analysis_results = {
-            'property_address': property_address,
-            'analysis_date': datetime.now().isoformat(),
-            'total_estimated_cost': 28500,
-            'condition_score': 7.2,
-            'categories': {
-                'roof': {'cost': 12000, 'condition': 'Fair', 'priority': 'High'},
-                'siding': {'cost': 8500, 'condition': 'Good', 'priority': 'Medium'},
-                'landscaping': {'cost': 4000, 'condition': 'Needs Work', 'priority': 'Low'},
-                'hardscaping': {'cost': 4000, 'condition': 'Fair', 'priority': 'Medium'}
-            },
-            'recommendations': [
-                'Address roof issues before winter season',
-                'Consider landscaping improvements for curb appeal',
-                'Schedule gutter cleaning and maintenance'
-            ]
-        }
+        # Uploads are analyzed straight from the request stream; only the
+        # results are kept so the report can be generated later
+        uploads = [file for file in files if file and allowed_file(file.filename)]
+        if not uploads:
+            flash('No valid image files uploaded')
+            return redirect(request.url)
+        
+        session_id = str(uuid.uuid4())
+        session_folder = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
+        os.makedirs(session_folder, exist_ok=True)
+        
+        analysis_results = analyzer.analyze_property(uploads, property_address)
+        analysis_results['property_address'] = property_address
+        analysis_results['session_id'] = session_id
+        analysis_results['upload_date'] = datetime.now().isoformat()
+        
+        results_file = os.path.join(session_folder, 'analysis_results.json')
+        with open(results_file, 'w') as f:
+            json.dump(analysis_results, f, indent=2)
         
-        return render_template('results.html', results=analysis_results)
+        return redirect(url_for('view_results', session_id=session_id))
     
     return render_template('upload.html')
 
+@app.route('/results/<session_id>')
+def view_results(session_id):
+    analysis_results = load_results(app.config['UPLOAD_FOLDER'], secure_filename(session_id))
+    
+    if analysis_results is None:
+        flash('Analysis results not found')
+        return redirect(url_for('index'))
+    
+    return render_template('results.html', results=analysis_results)
+
+@app.route('/api/results/<session_id>/issues')
+def session_issues(session_id):
+    analysis_results = load_results(app.config['UPLOAD_FOLDER'], secure_filename(session_id))
+    
+    if analysis_results is None:
+        return jsonify({'error': 'Analysis results not found'}), 404
+    
+    return jsonify(query_issues(analysis_results, request.args))
+
+@app.route('/generate_report/<session_id>')
+def generate_report(session_id):
+    session_id = secure_filename(session_id)
+    mtime = results_mtime(app.config['UPLOAD_FOLDER'], session_id)
+    analysis_results = load_results(app.config['UPLOAD_FOLDER'], session_id)
+    
+    if analysis_results is None:
+        flash('Analysis results not found')
+        return redirect(url_for('index'))
+    
+    try:
+        from report_generator import ReportGenerator
+    except ImportError:
+        flash('PDF reports are not available in this deployment; showing the web report instead')
+        return redirect(url_for('reports.html_report', session_id=session_id))
+    
+    report_path = ReportGenerator().generate_report(analysis_results, session_id, mtime)
+    
+    return send_file(os.path.abspath(report_path), as_attachment=True, download_name=f'property_analysis_{session_id}.pdf')
+
 @app.route('/api/analyze', methods=['POST'])
 def api_analyze():
     if 'file' not in request.files:
@@ -68,13 +116,9 @@ def api_analyze():
     if file.filename == '' or not allowed_file(file.filename):
         return jsonify({'error': 'Invalid file'}), 400
     
-    # Return demo results for API endpoint
-    return jsonify({
-        'status': 'success',
-        'message': 'Demo analysis complete',
-        'total_cost': 25000,
-        'condition_score': 7.5
-    })
+    analysis_results = analyzer.analyze_property([file], request.form.get('property_address'))
+    
+    return jsonify(analysis_results)
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -1,29 +1,195 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify
 import os
-import cv2
-import numpy as np
-from PIL import Image
 import json
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from werkzeug.utils import secure_filename
-from property_analyzer import PropertyAnalyzer
-from report_generator import ReportGenerator
+from session_results import load_results, results_mtime, query_issues
+from admission import AdmissionController, AdmissionRejected, estimate_memory
+from buffer_pool import peak_rss_mb
+from report_views import reports
+import tempfile
 import uuid
 
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
 app = Flask(__name__)
 app.secret_key = 'drone-analysis-secret-key-2024'
+app.register_blueprint(reports)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['UPLOAD_CHUNK_SIZE'] = 1024 * 1024  # Resumable upload chunk size
+app.config['UPLOAD_MAX_FILE_SIZE'] = 16 * 1024 * 1024  # Per photo, for chunked uploads
+app.config['UPLOAD_MAX_VIDEO_SIZE'] = 512 * 1024 * 1024  # Per video, for chunked uploads
+app.config['ANALYSIS_MAX_DIMENSION'] = 2048  # Client-side downscale target
+app.config['ANALYSIS_BUDGET_MS'] = 60000  # Detector time per request before optional detectors degrade
+app.config['PORTFOLIO_INDEX'] = 'portfolio_index.npz'  # Stored in UPLOAD_FOLDER
+app.config['ANALYSIS_SLOTS'] = os.cpu_count() or 1  # Analyses running at once
+app.config['ANALYSIS_MEMORY_BUDGET'] = 1024 * 1024 * 1024  # Estimated bytes held by running analyses
+app.config['ANALYSIS_QUEUE_LIMIT'] = 8  # Analyses waiting for capacity before new ones get a 429
+app.config['ANALYSIS_QUEUE_TIMEOUT'] = 30  # Seconds an analysis may wait for capacity
 
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs('reports', exist_ok=True)
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+VIDEO_EXTENSIONS = {'mp4', 'mov', 'm4v', 'avi'}
+ALLOWED_EXTENSIONS = IMAGE_EXTENSIONS | VIDEO_EXTENSIONS
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def is_video(filename):
+    return filename.rsplit('.', 1)[-1].lower() in VIDEO_EXTENSIONS
+
+# Process-wide analysis backends. OpenCV, NumPy and ReportLab are only
+# imported the first time one of these is requested, so the index and
+# upload-form routes come up without paying for them on a cold start.
+_analyzer = None
+_report_generator = None
+_portfolio = None
+_admission = None
+_analysis_pool = None
+_backend_lock = threading.Lock()
+
+def get_analyzer():
+    """Return the shared PropertyAnalyzer, creating it on first use"""
+    global _analyzer
+    if _analyzer is None:
+        with _backend_lock:
+            if _analyzer is None:
+                from property_analyzer import PropertyAnalyzer
+                _analyzer = PropertyAnalyzer()
+    return _analyzer
+
+def get_report_generator():
+    """Return the shared ReportGenerator, creating it on first use"""
+    global _report_generator
+    if _report_generator is None:
+        with _backend_lock:
+            if _report_generator is None:
+                from report_generator import ReportGenerator
+                _report_generator = ReportGenerator()
+    return _report_generator
+
+def get_portfolio():
+    """Return the shared PortfolioIndex, brought up to date with new sessions"""
+    global _portfolio
+    if _portfolio is None:
+        with _backend_lock:
+            if _portfolio is None:
+                from portfolio import PortfolioIndex
+                upload_folder = app.config['UPLOAD_FOLDER']
+                _portfolio = PortfolioIndex(
+                    upload_folder, os.path.join(upload_folder, app.config['PORTFOLIO_INDEX']))
+    _portfolio.refresh()
+    return _portfolio
+
+def get_admission():
+    """Return the shared AdmissionController, creating it on first use"""
+    global _admission
+    if _admission is None:
+        with _backend_lock:
+            if _admission is None:
+                _admission = AdmissionController(app.config['ANALYSIS_MEMORY_BUDGET'],
+                                                 app.config['ANALYSIS_SLOTS'],
+                                                 app.config['ANALYSIS_QUEUE_LIMIT'],
+                                                 app.config['ANALYSIS_QUEUE_TIMEOUT'])
+    return _admission
+
+def warm_up():
+    """Build both analysis backends ahead of the first request"""
+    get_analyzer()
+    get_report_generator()
+
+def use_analysis_pool(pool):
+    """Run analyses through pool.apply(func, args) rather than on request threads.
+    
+    serve.py passes the analysis processes it forked after building the
+    backends, so they start with OpenCV and the analyzer already loaded.
+    """
+    global _analysis_pool
+    _analysis_pool = pool
+
+def _session_folder(session_id):
+    return os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(session_id))
+
+def _previous_survey(previous_id):
+    """A stored session as the survey to compare with, or None"""
+    previous_results = load_results(app.config['UPLOAD_FOLDER'], previous_id)
+    if previous_results is None:
+        return None
+    from change_detection import load_previous_survey
+    return load_previous_survey(app.config['UPLOAD_FOLDER'], previous_id, previous_results)
+
+def _repeat_survey_requested():
+    return request.form.get('repeat_survey', '').lower() in ('1', 'on', 'true', 'yes')
+
+def _analyze(file_paths, property_address, session_id=None, repeat_survey=False):
+    """Analyze images and videos once the admission controller has room.
+    
+    With repeat_survey, photos are compared with the last survey of the same
+    address and only changed regions are re-analyzed. Raises
+    AdmissionRejected when the queue is full or the wait times out.
+    """
+    image_paths = [path for path in file_paths if not is_video(path)]
+    video_paths = [path for path in file_paths if is_video(path)]
+    max_dimension = app.config['ANALYSIS_MAX_DIMENSION']
+    
+    with get_admission().admit(estimate_memory(image_paths, video_paths, max_dimension)):
+        previous_id = None
+        if repeat_survey:
+            previous_id = get_portfolio().latest_session(property_address, exclude=session_id)
+        
+        job = (image_paths, property_address, video_paths, previous_id)
+        if _analysis_pool is not None:
+            return _analysis_pool.apply(_analysis_job, job)
+        return _analysis_job(*job)
+
+def _analysis_job(image_paths, property_address, video_paths, previous_id):
+    """One analysis, in this process or an analysis pool process"""
+    previous_survey = _previous_survey(previous_id) if previous_id is not None else None
+    return get_analyzer().analyze_property(image_paths, property_address, video_paths,
+                                           app.config['ANALYSIS_MAX_DIMENSION'],
+                                           app.config['ANALYSIS_BUDGET_MS'], previous_survey)
+
+def _run_analysis(session_id, file_paths, property_address, repeat_survey=False):
+    """Analyze a session's images and videos and save the results next to them"""
+    analysis_results = _analyze(file_paths, property_address, session_id, repeat_survey)
+    analysis_results['property_address'] = property_address
+    analysis_results['session_id'] = session_id
+    analysis_results['upload_date'] = datetime.now().isoformat()
+    
+    # Save analysis results
+    results_file = os.path.join(_session_folder(session_id), 'analysis_results.json')
+    with open(results_file, 'w') as f:
+        json.dump(analysis_results, f, indent=2)
+    
+    return analysis_results
+
+def _upload_page():
+    return render_template('upload.html',
+                           chunked_upload=True,
+                           accept_video=True,
+                           repeat_survey=True,
+                           chunk_size=app.config['UPLOAD_CHUNK_SIZE'],
+                           analysis_max_dimension=app.config['ANALYSIS_MAX_DIMENSION'])
+
+@app.errorhandler(AdmissionRejected)
+def analysis_saturated(e):
+    """429 with a Retry-After hint when analysis capacity is exhausted"""
+    headers = {'Retry-After': str(e.retry_after)}
+    if request.path.startswith(('/api/', '/upload/')):
+        return jsonify({'error': e.reason, 'retry_after': e.retry_after}), 429, headers
+    
+    flash(f'{e.reason}. Please try again in {e.retry_after} seconds.')
+    return _upload_page(), 429, headers
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -55,41 +221,228 @@ def upload_file():
                 uploaded_files.append(file_path)
         
         if uploaded_files:
-            analyzer = PropertyAnalyzer()
-            analysis_results = analyzer.analyze_property(uploaded_files)
-            analysis_results['property_address'] = property_address
-            analysis_results['session_id'] = session_id
-            analysis_results['upload_date'] = datetime.now().isoformat()
-            
-            # Save analysis results
-            results_file = os.path.join(session_folder, 'analysis_results.json')
-            with open(results_file, 'w') as f:
-                json.dump(analysis_results, f, indent=2)
-            
-            return render_template('results.html', results=analysis_results)
+            _run_analysis(session_id, uploaded_files, property_address, _repeat_survey_requested())
+            return redirect(url_for('view_results', session_id=session_id))
         else:
-            flash('No valid image files uploaded')
+            flash('No valid image or video files uploaded')
             return redirect(request.url)
     
-    return render_template('upload.html')
+    return _upload_page()
+
+# Resumable chunked uploads. The browser opens a session, PUTs each file in
+# order-checked chunks (asking for the received byte count to resume after a
+# dropped connection), then asks the server to analyze the assembled files.
+
+# Marks a session folder as opened by /upload/session
+UPLOAD_SESSION_MARKER = '.chunked_upload'
+
+@app.route('/upload/session', methods=['POST'])
+def create_upload_session():
+    session_id = str(uuid.uuid4())
+    session_folder = _session_folder(session_id)
+    os.makedirs(session_folder, exist_ok=True)
+    open(os.path.join(session_folder, UPLOAD_SESSION_MARKER), 'w').close()
+    return jsonify({'session_id': session_id, 'chunk_size': app.config['UPLOAD_CHUNK_SIZE']})
+
+def _upload_session_folder(session_id):
+    """Folder of a session opened by /upload/session, or None for any other id"""
+    try:
+        if str(uuid.UUID(session_id)) != session_id:
+            return None
+    except ValueError:
+        return None
+    session_folder = _session_folder(session_id)
+    if not os.path.exists(os.path.join(session_folder, UPLOAD_SESSION_MARKER)):
+        return None
+    return session_folder
+
+def _claim_name(path, client_name):
+    """Record client_name as the source of a stored file.
+    
+    Returns False if a different client name, sanitized to the same file
+    name, claimed it first. The record is linked into place whole, so a
+    concurrent claim never reads it half written.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(client_name)
+        os.link(temp_path, path)
+        return True
+    except FileExistsError:
+        with open(path, encoding='utf-8') as f:
+            return f.read() == client_name
+    finally:
+        os.remove(temp_path)
+
+# Serializes chunk appends where fcntl file locks are unavailable
+_chunk_lock = threading.Lock()
+
+@contextmanager
+def _locked_append(path):
+    """Open a file for appending under an exclusive lock.
+    
+    flock covers other threads and serve.py's forked workers alike; without
+    fcntl, a process-wide lock is the fallback.
+    """
+    with open(path, 'ab') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            yield f
+        else:
+            with _chunk_lock:
+                yield f
+
+@app.route('/upload/<session_id>/files/<filename>', methods=['GET', 'PUT'])
+def upload_chunk(session_id, filename):
+    session_folder = _upload_session_folder(session_id)
+    client_name, filename = filename, secure_filename(filename)
+    if session_folder is None or not allowed_file(filename):
+        return jsonify({'error': 'Unknown upload session or invalid file'}), 404
+    
+    file_path = os.path.join(session_folder, filename)
+    part_path = file_path + '.part'
+    
+    if not _claim_name(file_path + '.name', client_name):
+        return jsonify({'error': f'{client_name} is saved under the same name as another file '
+                                 f'in this upload ({filename}); rename one of them'}), 400
+    
+    if os.path.exists(file_path):
+        size = os.path.getsize(file_path)
+        return jsonify({'received': size, 'complete': True})
+    received = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    
+    if request.method == 'GET':
+        return jsonify({'received': received, 'complete': False})
+    
+    try:
+        offset = int(request.args['offset'])
+        total = int(request.args['total'])
+    except (KeyError, ValueError):
+        return jsonify({'error': 'offset and total are required'}), 400
+    
+    # MAX_CONTENT_LENGTH only bounds each chunk, so whole files are capped here
+    max_size = app.config['UPLOAD_MAX_VIDEO_SIZE' if is_video(filename) else 'UPLOAD_MAX_FILE_SIZE']
+    if not 0 < total <= max_size:
+        return jsonify({'error': f'Files must be at most {max_size // (1024 * 1024)}MB'}), 413
+    
+    # Concurrent PUTs for the same file take turns, and the offset is
+    # checked against the size under the lock
+    with _locked_append(part_path) as f:
+        received = f.seek(0, os.SEEK_END)
+        if os.path.exists(file_path):
+            # Completed by the PUT this one waited for; drop the empty part
+            # file opening it created again
+            if received == 0:
+                os.remove(part_path)
+            return jsonify({'received': os.path.getsize(file_path), 'complete': True})
+        
+        # Chunks must arrive in order; tell the client where to resume otherwise
+        if offset != received:
+            return jsonify({'received': received, 'complete': False}), 409
+        
+        # Never more than the declared total is written
+        remaining = total - received
+        while True:
+            block = request.stream.read(min(64 * 1024, remaining + 1))
+            if not block:
+                break
+            if len(block) > remaining:
+                f.truncate(0)
+                return jsonify({'error': 'Received more data than declared'}), 400
+            f.write(block)
+            remaining -= len(block)
+        f.flush()
+        received = total - remaining
+        
+        if received == total:
+            os.replace(part_path, file_path)
+    
+    return jsonify({'received': received, 'complete': received == total})
+
+@app.route('/upload/<session_id>/complete', methods=['POST'])
+def complete_upload(session_id):
+    session_folder = _upload_session_folder(session_id)
+    if session_folder is None:
+        return jsonify({'error': 'Unknown upload session'}), 404
+    
+    uploaded_files = sorted(
+        os.path.join(session_folder, name)
+        for name in os.listdir(session_folder)
+        if allowed_file(name)
+    )
+    if not uploaded_files:
+        return jsonify({'error': 'No valid image or video files uploaded'}), 400
+    
+    property_address = request.form.get('property_address', 'Unknown Property')
+    _run_analysis(session_id, uploaded_files, property_address, _repeat_survey_requested())
+    
+    return jsonify({'results_url': url_for('view_results', session_id=session_id)})
+
+@app.route('/results/<session_id>')
+def view_results(session_id):
+    analysis_results = load_results(app.config['UPLOAD_FOLDER'], secure_filename(session_id))
+    
+    if analysis_results is None:
+        flash('Analysis results not found')
+        return redirect(url_for('index'))
+    
+    # Issue cards are fetched page by page from session_issues
+    return render_template('results.html', results=analysis_results)
+
+@app.route('/api/results/<session_id>/issues')
+def session_issues(session_id):
+    analysis_results = load_results(app.config['UPLOAD_FOLDER'], secure_filename(session_id))
+    
+    if analysis_results is None:
+        return jsonify({'error': 'Analysis results not found'}), 404
+    
+    return jsonify(query_issues(analysis_results, request.args))
 
 @app.route('/generate_report/<session_id>')
 def generate_report(session_id):
-    session_folder = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
-    results_file = os.path.join(session_folder, 'analysis_results.json')
+    session_id = secure_filename(session_id)
+    mtime = results_mtime(app.config['UPLOAD_FOLDER'], session_id)
+    analysis_results = load_results(app.config['UPLOAD_FOLDER'], session_id)
     
-    if not os.path.exists(results_file):
+    if analysis_results is None:
         flash('Analysis results not found')
         return redirect(url_for('index'))
     
-    with open(results_file, 'r') as f:
-        analysis_results = json.load(f)
-    
-    report_generator = ReportGenerator()
-    report_path = report_generator.generate_report(analysis_results, session_id)
+    # The PDF is only rendered on request, and reused until the results change
+    report_generator = get_report_generator()
+    report_path = report_generator.generate_report(analysis_results, session_id, mtime)
     
     return send_file(report_path, as_attachment=True, download_name=f'property_analysis_{session_id}.pdf')
 
+@app.route('/api/portfolio')
+def api_portfolio():
+    """Cross-session analytics.
+
+    ?metric=roof_cost&group_by=zip&aggregate=mean&percentiles=25,50,75 groups
+    sessions by ZIP code or month; without group_by the metric's overall
+    distribution (percentiles and a histogram with ?bins=N) is returned.
+    """
+    portfolio = get_portfolio()
+    metric = request.args.get('metric', 'total_cost')
+    
+    try:
+        percentiles = [float(q) for q in request.args.get('percentiles', '').split(',') if q.strip()]
+        if any(q < 0 or q > 100 for q in percentiles):
+            raise ValueError('percentiles must be between 0 and 100')
+        
+        if request.args.get('group_by'):
+            result = portfolio.group_by(request.args['group_by'], metric,
+                                        request.args.get('aggregate', 'mean'), percentiles)
+        else:
+            result = portfolio.summary(metric, percentiles or (10, 25, 50, 75, 90),
+                                       int(request.args.get('bins', 10)))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    result['sessions'] = len(portfolio)
+    return jsonify(result)
+
 @app.route('/api/analyze', methods=['POST'])
 def api_analyze():
     if 'file' not in request.files:
@@ -107,19 +460,27 @@ def api_analyze():
     file_path = os.path.join(session_folder, filename)
     file.save(file_path)
     
-    analyzer = PropertyAnalyzer()
-    analysis_results = analyzer.analyze_property([file_path])
+    analysis_results = _analyze([file_path], request.form.get('property_address'), session_id,
+                                _repeat_survey_requested())
     
     return jsonify(analysis_results)
 
-# For Vercel deployment
-import tempfile
+@app.route('/api/admission')
+def api_admission():
+    """Analysis queue depth, in-flight count and memory gauges"""
+    return jsonify(dict(get_admission().gauges(), peak_rss_mb=peak_rss_mb()))
 
+# For Vercel deployment
 # Override upload folder for serverless environment
 if os.environ.get('VERCEL'):
     app.config['UPLOAD_FOLDER'] = '/tmp/uploads'
     os.makedirs('/tmp/uploads', exist_ok=True)
     os.makedirs('/tmp/reports', exist_ok=True)
 
+# Opt-in eager warm-up for long-lived workers that prefer paying the import
+# cost at boot rather than on the first analysis request
+if os.environ.get('WARM_START'):
+    warm_up()
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,351 @@
+"""Offline batch analysis of a directory tree of property folders.
+
+    python batch_analyze.py INPUT_DIR [--output DIR] [--processes N]
+                            [--no-reports] [--budget-ms N]
+
+Every folder under INPUT_DIR that directly holds photos or videos is one
+property. Its address is the first line of an address.txt in the folder,
+or else the folder name. Properties are analyzed by a pool of processes,
+each with its own PropertyAnalyzer and ReportGenerator; no Flask app is
+involved.
+
+Results are written as they finish, in the same layout as the app's upload
+folder: OUTPUT/<session id>/analysis_results.json plus the PDF report, so
+--output uploads makes them browsable in app_full.py. Progress is kept in
+two append-only logs:
+
+- OUTPUT/manifest.jsonl records each finished property with a fingerprint
+  of its files. Finished properties whose files are unchanged are skipped
+  on the next run.
+- OUTPUT/<session id>/frames.jsonl records each analyzed photo's issues as
+  it is analyzed, so a property interrupted by a crash resumes without
+  re-running the detectors on the photos it had finished.
+
+Video keyframes are not checkpointed; they are sampled again on resume.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+import multiprocessing
+import cv2
+import report_generator
+from property_analyzer import PropertyAnalyzer
+from session_results import RESULTS_FILENAME
+
+IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+VIDEO_EXTENSIONS = {'mp4', 'mov', 'm4v', 'avi'}
+
+MANIFEST_FILENAME = 'manifest.jsonl'
+CHECKPOINT_FILENAME = 'frames.jsonl'
+REPORT_FILENAME = 'property_analysis.pdf'
+ADDRESS_FILENAME = 'address.txt'
+
+DEFAULT_MAX_DIMENSION = 2048  # Longest side of sampled video keyframes, as in the app
+QUEUED_PER_PROCESS = 2  # Properties submitted ahead per process
+
+def _extension(filename):
+    return filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+
+def is_video(filename):
+    return _extension(filename) in VIDEO_EXTENSIONS
+
+def _read_log(path):
+    """Entries of a JSON-lines log; a last line cut short by a crash is ignored"""
+    entries = []
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return entries
+
+def _open_log(path):
+    """Open a JSON-lines log for appending after any partly written line"""
+    f = open(path, 'a+')
+    if f.tell():
+        f.seek(f.tell() - 1)
+        if f.read(1) != '\n':
+            f.write('\n')
+    return f
+
+def _append_log(f, entry):
+    f.write(json.dumps(entry) + '\n')
+    f.flush()
+    os.fsync(f.fileno())
+
+class FrameCheckpoint:
+    """Per-photo issues of one property, kept in its frames.jsonl.
+
+    Passed to PropertyAnalyzer.analyze_property, which looks photos up by
+    content digest, cost table version and view before analyzing them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.restored = 0
+        self.restored_digests = set()
+        self._issues = {tuple(entry['key']): entry['issues'] for entry in _read_log(path)}
+        self._file = None
+
+    def get(self, key):
+        issues = self._issues.get(key)
+        if issues is not None:
+            self.restored += 1
+            self.restored_digests.add(key[0])
+        return issues
+
+    def put(self, key, issues):
+        if key in self._issues:
+            return
+        self._issues[key] = [dict(issue) for issue in issues]
+        if self._file is None:
+            self._file = _open_log(self.path)
+        _append_log(self._file, {'key': list(key), 'issues': issues})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def session_id(relative):
+    """Session id of a property folder, safe as a single path component.
+
+    Readable from the folder path, and made unique by a short hash of it:
+    sanitizing alone maps "a/b" and a folder named "a__b" to the same name.
+    """
+    parts = [re.sub(r'[^A-Za-z0-9._-]+', '_', part) for part in relative.split(os.sep)]
+    readable = '__'.join(part.strip('._') or 'property' for part in parts)
+    digest = hashlib.blake2b(relative.replace(os.sep, '/').encode('utf-8', 'surrogateescape'),
+                             digest_size=4).hexdigest()
+    return f'{readable}-{digest}'
+
+def property_address(folder):
+    try:
+        with open(os.path.join(folder, ADDRESS_FILENAME), 'r') as f:
+            address = f.readline().strip()
+            if address:
+                return address
+    except OSError:
+        pass
+    return os.path.basename(os.path.abspath(folder)).replace('_', ' ')
+
+def find_properties(input_dir, exclude=None):
+    """(relative path, folder, media file names) of every property folder"""
+    exclude = os.path.realpath(exclude) if exclude else None
+    for folder, dirnames, filenames in os.walk(input_dir):
+        dirnames[:] = sorted(name for name in dirnames if not name.startswith('.')
+                             and os.path.realpath(os.path.join(folder, name)) != exclude)
+        files = sorted(name for name in filenames
+                       if _extension(name) in IMAGE_EXTENSIONS | VIDEO_EXTENSIONS)
+        if files:
+            relative = os.path.relpath(folder, input_dir)
+            if relative == '.':
+                relative = os.path.basename(os.path.abspath(input_dir))
+            yield relative, folder, files
+
+def fingerprint(folder, files):
+    """Digest of a property's file names, sizes and modification times"""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in files:
+        stat = os.stat(os.path.join(folder, name))
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+# Per-process backends, built by _init_worker
+_analyzer = None
+_report_generator = None
+
+def _init_worker(write_reports):
+    global _analyzer, _report_generator
+    # Ctrl-C is handled by the parent, which lets running properties finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # The pool already keeps every core busy; nested threads and report
+    # section processes would only compete with it
+    cv2.setNumThreads(1)
+    report_generator.REPORT_WORKERS = 1
+    _analyzer = PropertyAnalyzer()
+    if write_reports:
+        _report_generator = report_generator.ReportGenerator()
+
+def _analyze_property(relative, folder, files, files_fingerprint, output_dir, options):
+    """Analyze one property folder and write its results; returns its manifest entry"""
+    started = time.monotonic()
+    paths = [os.path.join(folder, name) for name in files]
+    image_paths = [path for path in paths if not is_video(path)]
+    video_paths = [path for path in paths if is_video(path)]
+    entry = {
+        'property': relative,
+        'fingerprint': files_fingerprint,
+        'images': len(image_paths),
+        'videos': len(video_paths),
+        'bytes': sum(os.path.getsize(path) for path in paths)
+    }
+
+    target = os.path.join(output_dir, session_id(relative))
+    os.makedirs(target, exist_ok=True)
+    checkpoint = FrameCheckpoint(os.path.join(target, CHECKPOINT_FILENAME))
+    try:
+        address = property_address(folder)
+        results = _analyzer.analyze_property(image_paths, address, video_paths, options['max_dimension'],
+                                             options['budget_ms'], checkpoint=checkpoint)
+        results['property_address'] = address
+        results['session_id'] = session_id(relative)
+        results['upload_date'] = datetime.now().isoformat()
+        results['source_folder'] = os.path.abspath(folder)
+
+        # Written under a temporary name so a crash never leaves half a file
+        results_file = os.path.join(target, RESULTS_FILENAME)
+        with open(results_file + '.tmp', 'w') as f:
+            json.dump(results, f, indent=2)
+        os.replace(results_file + '.tmp', results_file)
+        entry['results'] = results_file
+
+        if _report_generator is not None:
+            entry['report'] = _report_generator.generate_report(
+                results, results['session_id'], report_filename=os.path.join(target, REPORT_FILENAME))
+
+        entry['status'] = 'done'
+        entry['issues'] = len(results['issues_found'])
+        entry['total_estimated_cost'] = results['total_estimated_cost']
+    except Exception as e:
+        print(f"Error analyzing {relative}: {e}")
+        entry['status'] = 'failed'
+        entry['error'] = str(e)
+    finally:
+        checkpoint.close()
+
+    entry['frames_restored'] = checkpoint.restored
+    # Restored photos were analyzed by an earlier run; their sizes are only
+    # looked up (by digest, which rereads the files) when there are any
+    entry['bytes_restored'] = sum(
+        os.path.getsize(path) for path in image_paths
+        if checkpoint.restored and _analyzer._frame_digest(path) in checkpoint.restored_digests)
+    entry['seconds'] = round(time.monotonic() - started, 2)
+    return entry
+
+def run(input_dir, output_dir, processes, write_reports=True, max_dimension=DEFAULT_MAX_DIMENSION,
+        budget_ms=None):
+    """Analyze every unfinished property under input_dir; returns an exit status"""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+
+    # The last entry of a property wins; only finished, unchanged ones are skipped
+    finished = {entry['property']: entry for entry in _read_log(manifest_path)}
+    pending = []
+    skipped = 0
+    for relative, folder, files in find_properties(input_dir, exclude=output_dir):
+        files_fingerprint = fingerprint(folder, files)
+        previous = finished.get(relative)
+        if previous and previous['status'] == 'done' and previous['fingerprint'] == files_fingerprint:
+            skipped += 1
+            continue
+        pending.append((relative, folder, files, files_fingerprint))
+    print(f"{len(pending)} properties to analyze, {skipped} already done")
+
+    options = {'max_dimension': max_dimension, 'budget_ms': budget_ms}
+    totals = {'done': 0, 'failed': 0, 'images': 0, 'bytes': 0, 'frames_restored': 0}
+    status = 0
+    started = time.monotonic()
+
+    jobs = iter(pending)
+    running = set()
+    stopping = False
+    manifest = _open_log(manifest_path)
+    pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(write_reports,))
+    try:
+        while True:
+            try:
+                while not stopping and len(running) < processes * QUEUED_PER_PROCESS:
+                    job = next(jobs, None)
+                    if job is None:
+                        break
+                    running.add(pool.submit(_analyze_property, *job, output_dir, options))
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+            except KeyboardInterrupt:
+                if stopping:
+                    raise
+                # Queued properties are dropped; those in progress finish
+                stopping = True
+                for future in running:
+                    future.cancel()
+                print("Stopping after the properties in progress; press Ctrl-C again to stop now")
+                continue
+
+            for future in done:
+                if future.cancelled():
+                    continue
+                try:
+                    entry = future.result()
+                except BrokenProcessPool as e:
+                    # Every property still in the pool fails with it
+                    if not status:
+                        print(f"Error: an analysis process died ({e}); rerun to resume")
+                    stopping = True
+                    status = 1
+                    continue
+                _append_log(manifest, entry)
+                totals[entry['status']] += 1
+                # Throughput counts only what this run analyzed
+                totals['images'] += entry['images'] - entry['frames_restored']
+                totals['bytes'] += entry['bytes'] - entry['bytes_restored']
+                totals['frames_restored'] += entry['frames_restored']
+                print(f"[{totals['done'] + totals['failed']}/{len(pending)}] {entry['property']}: "
+                      f"{entry['status']}, {entry['images']} images in {entry['seconds']}s")
+    except KeyboardInterrupt:
+        # Photos finished so far are already in their checkpoints
+        for process in multiprocessing.active_children():
+            process.terminate()
+        print("Stopped; rerun to resume")
+        status = 1
+    finally:
+        pool.shutdown(wait=status == 0, cancel_futures=True)
+        manifest.close()
+
+    elapsed = max(time.monotonic() - started, 1e-6)
+    megabytes = totals['bytes'] / (1024 * 1024)
+    print(f"Analyzed {totals['done']} properties ({totals['failed']} failed, {skipped} already done) "
+          f"in {elapsed:.1f}s")
+    print(f"Throughput: {totals['images'] / elapsed:.2f} images/sec, {megabytes / elapsed:.2f} MB/sec "
+          f"({totals['images']} images, {megabytes:.1f} MB analyzed)")
+    if totals['frames_restored']:
+        print(f"{totals['frames_restored']} photos restored from checkpoints, not counted above")
+
+    return 1 if status or totals['failed'] else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a directory tree of property folders")
+    parser.add_argument('input_dir')
+    parser.add_argument('--output', default='batch_results',
+                        help="results, reports and the manifest (default: batch_results)")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help="analysis processes (default: one per CPU)")
+    parser.add_argument('--no-reports', action='store_true', help="skip the PDF reports")
+    parser.add_argument('--budget-ms', type=int, default=None,
+                        help="detector time per property before optional detectors degrade (default: unlimited)")
+    parser.add_argument('--max-dimension', type=int, default=DEFAULT_MAX_DIMENSION,
+                        help="longest side of sampled video keyframes")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.input_dir):
+        print(f"Error: {args.input_dir} is not a directory")
+        return 1
+
+    return run(args.input_dir, args.output, max(1, args.processes), not args.no_reports,
+               args.max_dimension, args.budget_ms)
+
+if __name__ == '__main__':
+    sys.exit(main())
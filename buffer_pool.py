@@ -0,0 +1,99 @@
+"""Reusable NumPy buffers for per-frame OpenCV intermediates.
+
+A frame's working arrays (enhanced copy, blur, gray, HSV, edges) have the
+same few shapes from one photo to the next. BufferPool hands them out by
+(shape, dtype) and takes them back once the frame is done, so a long run
+reuses a handful of buffers instead of allocating and freeing hundreds of
+megabytes per photo. OpenCV writes into them through its dst= outputs.
+
+Idle buffers are kept up to max_bytes, least recently returned first out.
+"""
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+class BufferPool:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._idle = OrderedDict()  # (shape, dtype) -> list of arrays
+        self._idle_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def acquire(self, shape, dtype=np.uint8):
+        """An uninitialized array of the given shape and dtype"""
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            buffers = self._idle.get(key)
+            if buffers:
+                array = buffers.pop()
+                if not buffers:
+                    del self._idle[key]
+                self._idle_bytes -= array.nbytes
+                self._stats['hits'] += 1
+                return array
+            self._stats['misses'] += 1
+        return np.empty(key[0], dtype=dtype)
+
+    def release(self, array):
+        """Return an array to the pool; it must no longer be used"""
+        if array.nbytes > self.max_bytes:
+            return
+        key = (array.shape, array.dtype.str)
+        with self._lock:
+            self._idle.setdefault(key, []).append(array)
+            self._idle.move_to_end(key)
+            self._idle_bytes += array.nbytes
+            while self._idle_bytes > self.max_bytes:
+                oldest_key, buffers = next(iter(self._idle.items()))
+                evicted = buffers.pop(0)
+                if not buffers:
+                    del self._idle[oldest_key]
+                self._idle_bytes -= evicted.nbytes
+                self._stats['evictions'] += 1
+
+    def lease(self):
+        """Lease whose buffers all go back to the pool when it closes"""
+        return Lease(self)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, idle_bytes=self._idle_bytes, max_bytes=self.max_bytes)
+
+class Lease:
+    """Buffers taken for one frame; use as a context manager"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._taken = []
+
+    def take(self, shape, dtype=np.uint8):
+        array = self.pool.acquire(shape, dtype)
+        self._taken.append(array)
+        return array
+
+    def close(self):
+        for array in self._taken:
+            self.pool.release(array)
+        self._taken = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
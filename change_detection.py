@@ -0,0 +1,181 @@
+"""Change detection between repeat surveys of the same property.
+
+A PreviousSurvey wraps the stored results and frames of an earlier session
+for the same address. register() finds the earlier frame showing the same
+scene as a new frame: ORB features on REGISTRATION_WIDTH grayscale copies,
+ratio-tested Hamming matches and a RANSAC homography. The earlier frame is
+then warped onto the new one and both are normalized for exposure, so a
+different time of day does not count as change. The frame is divided into
+a GRID x GRID set of tiles, and a tile has changed when its mean difference
+exceeds CHANGE_THRESHOLD or the earlier frame does not cover it.
+
+The analyzer reuses the earlier frame's issues when no tile has changed,
+and analyzes the frame again otherwise.
+"""
+import os
+import cv2
+import numpy as np
+import frame_dedup
+
+REGISTRATION_WIDTH = 640  # Width of the grayscale copies frames are registered on
+ORB_FEATURES = 1000
+MATCH_RATIO = 0.75  # Lowe's ratio test for ORB matches
+MIN_INLIERS = 25  # Homography inliers needed to accept a registration
+GOOD_INLIERS = 150  # Stop searching once a registration is this strong
+MAX_CANDIDATES = 8  # Earlier frames tried per new frame, nearest dHash first
+
+GRID = 4  # Tiles per side
+CHANGE_THRESHOLD = 18.0  # Mean absolute difference (0-255) of a changed tile
+MIN_COVERAGE = 0.6  # Fraction of a tile the earlier frame must cover
+
+def _reduced_gray(img):
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    height, width = gray.shape
+    if width <= REGISTRATION_WIDTH:
+        return gray
+    scale = REGISTRATION_WIDTH / width
+    return cv2.resize(gray, (REGISTRATION_WIDTH, max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+
+def _normalized(gray, mask):
+    """Gray levels rescaled to a common mean and spread within mask"""
+    values = gray[mask].astype(np.float32)
+    mean, std = float(values.mean()), float(values.std()) or 1.0
+    normalized = (gray.astype(np.float32) - mean) * (40.0 / std) + 128.0
+    return cv2.GaussianBlur(np.clip(normalized, 0, 255), (5, 5), 0)
+
+def _homography(matcher, old, new):
+    """Homography mapping old keypoints onto new ones, and its inlier count"""
+    old_keypoints, old_descriptors = old
+    new_keypoints, new_descriptors = new
+    if old_descriptors is None or new_descriptors is None or len(old_keypoints) < 2 or len(new_keypoints) < 2:
+        return None, 0
+
+    good = []
+    for pair in matcher.knnMatch(old_descriptors, new_descriptors, k=2):
+        if len(pair) == 2 and pair[0].distance < MATCH_RATIO * pair[1].distance:
+            good.append(pair[0])
+    if len(good) < MIN_INLIERS:
+        return None, 0
+
+    source = np.float32([old_keypoints[m.queryIdx].pt for m in good]).reshape(-1, 1, 2)
+    target = np.float32([new_keypoints[m.trainIdx].pt for m in good]).reshape(-1, 1, 2)
+    homography, inlier_mask = cv2.findHomography(source, target, cv2.RANSAC, 5.0)
+    if homography is None:
+        return None, 0
+    return homography, int(inlier_mask.sum())
+
+def changed_tiles(old_gray, new_gray, homography):
+    """GRID x GRID boolean array of the new frame's changed tiles"""
+    height, width = new_gray.shape
+    warped = cv2.warpPerspective(old_gray, homography, (width, height))
+    covered = cv2.warpPerspective(np.full(old_gray.shape, 255, np.uint8), homography, (width, height)) > 0
+
+    tiles = np.ones((GRID, GRID), dtype=bool)
+    if covered.sum() < MIN_COVERAGE * covered.size / (GRID * GRID):
+        return tiles
+
+    difference = cv2.absdiff(_normalized(warped, covered), _normalized(new_gray, covered))
+    for row in range(GRID):
+        top, bottom = row * height // GRID, (row + 1) * height // GRID
+        for col in range(GRID):
+            left, right = col * width // GRID, (col + 1) * width // GRID
+            tile_covered = covered[top:bottom, left:right]
+            if tile_covered.mean() < MIN_COVERAGE:
+                continue
+            tiles[row, col] = difference[top:bottom, left:right][tile_covered].mean() > CHANGE_THRESHOLD
+    return tiles
+
+class Registration:
+    """A new frame registered against the earlier frame of the same scene"""
+
+    def __init__(self, frame, issues, tiles, inliers):
+        self.frame = frame
+        self.issues = issues
+        self.tiles = tiles
+        self.inliers = inliers
+        self.changed = bool(tiles.any())
+
+class PreviousSurvey:
+    def __init__(self, results, folder):
+        self.session_id = results.get('session_id')
+        self.cost_table_version = results.get('cost_table_version')
+        self.region = results.get('region') or {}
+        self.folder = folder
+        self._issues = results.get('issues_found', [])
+        self.frames = [frame for frame in results.get('frames', [])
+                       if os.path.exists(os.path.join(folder, frame['name']))]
+        self._hashes = {}
+        self._features = {}
+        # Each earlier frame's issues are reused by one new frame at most
+        self._claimed = set()
+        # OpenCV feature objects are not shared between threads; a survey
+        # belongs to one request
+        self._orb = cv2.ORB_create(ORB_FEATURES)
+        self._matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def compatible(self, table_version, region):
+        """Whether the earlier issues were priced like this survey's"""
+        region = region or {}
+        return (self.cost_table_version == table_version
+                and self.region.get('region') == region.get('region')
+                and self.region.get('version') == region.get('version'))
+
+    def _path(self, index):
+        return os.path.join(self.folder, self.frames[index]['name'])
+
+    def _frame_features(self, index):
+        if index not in self._features:
+            img = cv2.imread(self._path(index))
+            if img is None:
+                self._features[index] = None
+            else:
+                gray = _reduced_gray(img)
+                self._features[index] = (gray, self._orb.detectAndCompute(gray, None))
+        return self._features[index]
+
+    def _candidates(self, image_path, view):
+        """Earlier frames of a compatible view, nearest dHash first"""
+        target = frame_dedup.dhash(image_path)
+        candidates = []
+        for index, frame in enumerate(self.frames):
+            if index in self._claimed:
+                continue
+            if 'unknown' not in (view, frame['view']) and frame['view'] != view:
+                continue
+            if index not in self._hashes:
+                self._hashes[index] = frame_dedup.dhash(self._path(index))
+            candidates.append((frame_dedup.hamming(target, self._hashes[index]), index))
+        return [index for _, index in sorted(candidates)[:MAX_CANDIDATES]]
+
+    def register(self, image_path, img, view):
+        """Registration of a decoded frame against the earlier survey, or None"""
+        new_gray = _reduced_gray(img)
+        new_features = self._orb.detectAndCompute(new_gray, None)
+
+        best = None
+        for index in self._candidates(image_path, view):
+            features = self._frame_features(index)
+            if features is None:
+                continue
+            homography, inliers = _homography(self._matcher, features[1], new_features)
+            if homography is not None and inliers >= MIN_INLIERS and (best is None or inliers > best[2]):
+                best = (index, homography, inliers)
+                if inliers >= GOOD_INLIERS:
+                    break
+        if best is None:
+            return None
+
+        index, homography, inliers = best
+        self._claimed.add(index)
+        tiles = changed_tiles(self._features[index][0], new_gray, homography)
+        frame = self.frames[index]
+        issues = [dict(self._issues[i]) for i in frame['issues'] if i < len(self._issues)]
+        return Registration(frame['name'], issues, tiles, inliers)
+
+def load_previous_survey(upload_folder, session_id, results):
+    """PreviousSurvey for a stored session, or None if it has no frame records"""
+    survey = PreviousSurvey(results, os.path.join(upload_folder, session_id))
+    return survey if len(survey) else None
@@ -0,0 +1,118 @@
+import cv2
+import numpy as np
+
+# Saturation and value are quantized to 32 bins of 8 levels each; hue keeps
+# OpenCV's full 180-level resolution
+HUE_BINS = 180
+SV_BIN_WIDTH = 8
+SV_BINS = 256 // SV_BIN_WIDTH
+
+_GRAY_LEVELS = np.arange(256, dtype=np.float64)
+
+class ColorStatistics:
+    """Frame statistics derived from one gray and one HSV histogram.
+
+    Each frame is scanned once by cv2.calcHist per colour space. The gray
+    mean and the coverage of any HSV band are then computed from the small
+    histograms rather than from the full-size pixel arrays, so adding
+    another colour-based check costs a few hundred additions instead of
+    another pass over the image.
+
+    hsv may also be a zero-argument callable returning the HSV frame; it is
+    then converted and histogrammed only when a band is first queried.
+    """
+
+    def __init__(self, gray, hsv):
+        self.pixel_count = gray.shape[0] * gray.shape[1]
+        self.gray_hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+        self._hsv = hsv
+        self._hsv_hist = None
+
+        self.mean = float((self.gray_hist * _GRAY_LEVELS).sum() / self.pixel_count)
+
+    @property
+    def hsv_hist(self):
+        if self._hsv_hist is None:
+            hsv = self._hsv() if callable(self._hsv) else self._hsv
+            self._hsv_hist = cv2.calcHist(
+                [hsv], [0, 1, 2], None,
+                [HUE_BINS, SV_BINS, SV_BINS],
+                [0, 180, 0, 256, 0, 256]
+            )
+            self._hsv = None
+        return self._hsv_hist
+
+    def band_ratio(self, lower, upper):
+        """Fraction of pixels whose HSV value lies within [lower, upper]"""
+        lower_h, lower_s, lower_v = lower
+        upper_h, upper_s, upper_v = upper
+        count = self.hsv_hist[
+            lower_h:upper_h + 1,
+            _first_bin(lower_s):_last_bin(upper_s) + 1,
+            _first_bin(lower_v):_last_bin(upper_v) + 1
+        ].sum()
+        return float(count / self.pixel_count)
+
+class FrameInputs:
+    """Detector inputs of one BGR frame, each computed on first use.
+
+    Detectors declare the attributes they need (gray, hsv, stats, edges,
+    texture_std); reduced() returns the same inputs for a copy of the frame
+    scaled by scale, for detectors downgraded to a cheaper resolution. With
+    a buffer_pool.Lease, every array is written into a pooled buffer.
+
+    texture is a zero-argument callable returning the frame's grayscale
+    copy at analysis_rules.TEXTURE_SIZE, whose spread is texture_std.
+    """
+
+    def __init__(self, image, lease=None, texture=None):
+        self.image = image
+        self._lease = lease
+        self._texture = texture
+        self._computed = {}
+
+    def _buffer(self, shape):
+        return self._lease.take(shape) if self._lease is not None else None
+
+    def _get(self, name, compute):
+        if name not in self._computed:
+            self._computed[name] = compute()
+        return self._computed[name]
+
+    @property
+    def gray(self):
+        return self._get('gray', lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY,
+                                                      dst=self._buffer(self.image.shape[:2])))
+
+    @property
+    def hsv(self):
+        return self._get('hsv', lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2HSV,
+                                                     dst=self._buffer(self.image.shape)))
+
+    @property
+    def stats(self):
+        return self._get('stats', lambda: ColorStatistics(self.gray, lambda: self.hsv))
+
+    @property
+    def edges(self):
+        return self._get('edges', lambda: cv2.Canny(self.gray, 50, 150,
+                                                    edges=self._buffer(self.image.shape[:2])))
+
+    @property
+    def texture_std(self):
+        return self._get('texture_std', lambda: float(self._texture().std()))
+
+    def reduced(self, scale):
+        height, width = self.image.shape[:2]
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        resized = cv2.resize(self.image, size, dst=self._buffer((size[1], size[0]) + self.image.shape[2:]),
+                             interpolation=cv2.INTER_AREA)
+        return FrameInputs(resized, self._lease, self._texture)
+
+def _first_bin(value):
+    """First S/V bin lying entirely at or above value"""
+    return -(-value // SV_BIN_WIDTH)
+
+def _last_bin(value):
+    """Last S/V bin lying entirely at or below value"""
+    return (value + 1) // SV_BIN_WIDTH - 1
@@ -0,0 +1,133 @@
+"""Versioned, hot-reloadable cost tables.
+
+Every price and severity-dependent number used by the analysis lives in
+cost_tables.json (or the file named by COST_TABLES_PATH). It is compiled
+once into a CostTable whose per-severity values are flat tuples indexed by
+the SEVERITIES enum, so lookups in the hot path are a dict-free tuple
+index. Issues are priced from their templates.
+
+current() re-checks the file's mtime at most every RELOAD_CHECK_INTERVAL
+seconds and swaps in a recompiled table when its contents change, so price
+updates reach running workers without a restart. Results are cached by
+table version, so an edit that keeps the old version is refused, as is a
+file that fails to parse or validate; either is reported and the previous
+table stays in use.
+"""
+import os
+import json
+import hashlib
+import time
+import threading
+
+SEVERITIES = ('high', 'medium', 'low')
+COST_CATEGORIES = ('roof', 'siding', 'landscaping', 'hardscaping', 'windows', 'gutters')
+
+SEVERITY_INDEX = {severity: index for index, severity in enumerate(SEVERITIES)}
+
+DEFAULT_PATH = os.environ.get('COST_TABLES_PATH') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'cost_tables.json')
+
+RELOAD_CHECK_INTERVAL = 2.0
+
+class CostTable:
+    """Compiled form of one cost table version"""
+
+    def __init__(self, config):
+        self.version = str(config['version'])
+        self.default_recommendation = config.get(
+            'default_recommendation', 'Professional assessment recommended')
+
+        severities = config['severities']
+        self.severity_weight = tuple(severities[s]['weight'] for s in SEVERITIES)
+        self.severity_weeks = tuple(severities[s]['weeks'] for s in SEVERITIES)
+        self.severity_recommendation = tuple(severities[s]['recommendation'] for s in SEVERITIES)
+
+        self.issues = {
+            group: tuple(self._compile_issue(group, template) for template in templates)
+            for group, templates in config['issues'].items()
+        }
+
+    def _compile_issue(self, group, template):
+        severity = template['severity']
+        if severity not in SEVERITY_INDEX:
+            raise ValueError(f"Unknown severity '{severity}' in issue group '{group}'")
+        if not 0 <= template['min'] <= template['max']:
+            raise ValueError(f"Invalid cost range in issue group '{group}'")
+        return {
+            'description': template['description'],
+            'severity': severity,
+            'cost_range': {'min': template['min'], 'max': template['max']},
+            'confidence': template.get('confidence'),
+            'recommendation': template.get('recommendation')
+        }
+
+    def weight(self, severity):
+        index = SEVERITY_INDEX.get(severity)
+        return 1 if index is None else self.severity_weight[index]
+
+    def weeks(self, severity):
+        index = SEVERITY_INDEX.get(severity)
+        return 1 if index is None else self.severity_weeks[index]
+
+    def recommendation(self, severity):
+        index = SEVERITY_INDEX.get(severity)
+        return self.default_recommendation if index is None else self.severity_recommendation[index]
+
+def load_cost_table(path=DEFAULT_PATH):
+    """Read and compile a cost table file"""
+    with open(path, 'r') as f:
+        return CostTable(json.load(f))
+
+_current = None
+_current_mtime = None
+_current_digest = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+def current():
+    """The active cost table, reloaded if its file has changed"""
+    if _current is None or time.monotonic() - _checked_at >= RELOAD_CHECK_INTERVAL:
+        _check_for_update()
+    return _current
+
+def reload():
+    """Recompile the cost table now, regardless of the check interval"""
+    _check_for_update(force=True)
+    return _current
+
+def _check_for_update(force=False):
+    global _current, _current_mtime, _current_digest, _checked_at
+    with _lock:
+        _checked_at = time.monotonic()
+        try:
+            mtime = os.path.getmtime(DEFAULT_PATH)
+        except OSError as e:
+            if _current is None:
+                raise
+            print(f"Error checking cost tables {DEFAULT_PATH}: {e}")
+            return
+
+        if not force and _current is not None and mtime == _current_mtime:
+            return
+
+        try:
+            with open(DEFAULT_PATH, 'rb') as f:
+                content = f.read()
+            digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+            if _current is not None and digest == _current_digest:
+                _current_mtime = mtime  # Touched, not changed
+                return
+            table = CostTable(json.loads(content))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            if _current is None:
+                raise
+            print(f"Error reloading cost tables {DEFAULT_PATH}, keeping version {_current.version}: {e}")
+            return
+
+        if _current is not None and table.version == _current.version:
+            print(f"Error reloading cost tables {DEFAULT_PATH}: contents changed but version "
+                  f"{table.version} did not; bump it to apply the new prices")
+            _current_mtime = mtime  # Warn once per edit
+            return
+
+        _current, _current_mtime, _current_digest = table, mtime, digest
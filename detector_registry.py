@@ -0,0 +1,124 @@
+"""Pluggable frame detectors with latency budgets.
+
+An analysis backend keeps one DetectorRegistry and registers each detector
+with the category it reports on, the frame inputs it needs (passed to it
+positionally, in the declared order, followed by the cost table) and an
+estimated cost in milliseconds. The estimate is refined with a moving
+average of measured run times.
+
+run() executes the detectors for a set of categories against two budgets:
+one for the frame and one for the whole request. Required detectors always
+run. An optional detector runs at full resolution while the tighter budget
+still covers its estimate, falls back to the reduced-resolution inputs when
+only that estimate fits, and is skipped otherwise. Every decision is
+recorded so results can report what actually ran.
+
+Stdlib only; the inputs object is supplied by the backend.
+"""
+import time
+import threading
+
+# Starting estimate for a reduced-resolution run, relative to a full one
+REDUCED_COST_FACTOR = 0.3
+
+# Weight of the newest measurement in the running cost estimate
+COST_SMOOTHING = 0.2
+
+RUN_MODES = ('full', 'reduced', 'skipped')
+
+class Budget:
+    """Wall-clock allowance in milliseconds; a limit of None never runs out"""
+
+    def __init__(self, limit_ms=None):
+        self.limit_ms = limit_ms
+        self.started = time.perf_counter()
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def remaining_ms(self):
+        if self.limit_ms is None:
+            return float('inf')
+        return self.limit_ms - self.elapsed_ms()
+
+class Detector:
+    def __init__(self, name, category, func, inputs, cost_ms, optional):
+        self.name = name
+        self.category = category
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.optional = optional
+        self._estimates = {'full': float(cost_ms), 'reduced': float(cost_ms) * REDUCED_COST_FACTOR}
+        self._lock = threading.Lock()
+
+    def estimate_ms(self, mode):
+        return self._estimates[mode]
+
+    def observe(self, mode, elapsed_ms):
+        with self._lock:
+            self._estimates[mode] += COST_SMOOTHING * (elapsed_ms - self._estimates[mode])
+
+class DetectorRegistry:
+    def __init__(self):
+        self._detectors = {}
+
+    def register(self, name, category, inputs=(), cost_ms=1.0, optional=False):
+        """Decorator registering a detector function under name"""
+        def decorator(func):
+            if name in self._detectors:
+                raise ValueError(f"Detector '{name}' is already registered")
+            self._detectors[name] = Detector(name, category, func, inputs, cost_ms, optional)
+            return func
+        return decorator
+
+    def __iter__(self):
+        return iter(self._detectors.values())
+
+    def names(self):
+        return list(self._detectors)
+
+    def run(self, owner, categories, inputs, reduced_inputs, table, frame_budget, request_budget):
+        """Run the detectors for categories; returns (issues, modes by detector).
+
+        owner is passed as the first argument, so methods can be registered.
+        reduced_inputs is a zero-argument callable, only called if some
+        detector is downgraded.
+        """
+        issues = []
+        modes = {}
+        reduced = None
+
+        for detector in self._detectors.values():
+            if detector.category not in categories:
+                continue
+
+            mode = 'full'
+            if detector.optional:
+                remaining = min(frame_budget.remaining_ms(), request_budget.remaining_ms())
+                if remaining < detector.estimate_ms('full'):
+                    mode = 'reduced' if remaining >= detector.estimate_ms('reduced') else 'skipped'
+            modes[detector.name] = mode
+            if mode == 'skipped':
+                continue
+
+            if mode == 'reduced':
+                if reduced is None:
+                    reduced = reduced_inputs()
+                source = reduced
+            else:
+                source = inputs
+
+            started = time.perf_counter()
+            arguments = [getattr(source, name) for name in detector.inputs]
+            issues.extend(detector.func(owner, *arguments, table))
+            detector.observe(mode, (time.perf_counter() - started) * 1000)
+
+        return issues, modes
+
+def new_run_counts(registry):
+    """Per-detector counters of how often each run mode was chosen"""
+    return {name: {mode: 0 for mode in RUN_MODES} for name in registry.names()}
+
+def count_runs(counts, modes):
+    for name, mode in modes.items():
+        counts[name][mode] += 1
@@ -0,0 +1,146 @@
+"""Near-duplicate detection for overlapping drone frames.
+
+Each frame is reduced to a 64-bit difference hash (dHash) from a tiny
+draft-mode decode, and frames whose hashes are within a small Hamming
+distance of an earlier frame are grouped with it, provided the 9x8
+thumbnails the hashes come from also look alike. Only one representative
+per group needs to go through the detectors.
+
+Featureless frames (sky, bare siding, overexposed shots) all hash to about
+0, so they are never grouped and each is analyzed on its own.
+"""
+from PIL import Image, ImageStat
+
+# dHash is computed on a 9x8 grayscale thumbnail: 8 comparisons per row
+HASH_WIDTH = 9
+HASH_HEIGHT = 8
+
+# Frames whose hashes differ in at most this many of the 64 bits are
+# treated as the same view
+DEFAULT_MAX_DISTANCE = 6
+
+# Frames whose draft decode has a grayscale standard deviation below this
+# carry too little detail for their hash to tell them apart
+MIN_DETAIL_STD = 8.0
+
+# Frames with matching hashes are grouped only if their thumbnails differ
+# by at most this many gray levels per pixel on average; smooth gradients
+# of different scenes share a hash but not their brightness
+MAX_THUMBNAIL_DIFFERENCE = 16
+
+def _thumbnail(source):
+    """9x8 grayscale thumbnail pixels and the standard deviation of the decode"""
+    img = Image.open(source)
+    # JPEGs decode at 1/8 scale here; the hash only needs a 9x8 thumbnail
+    img.draft('L', (HASH_WIDTH * 8, HASH_HEIGHT * 8))
+    gray = img.convert('L')
+    pixels = list(gray.resize((HASH_WIDTH, HASH_HEIGHT), Image.BILINEAR).getdata())
+    return pixels, ImageStat.Stat(gray).stddev[0]
+
+def dhash(source):
+    """64-bit difference hash of an image path or file object"""
+    return _difference_hash(_thumbnail(source)[0])
+
+def _difference_hash(pixels):
+    value = 0
+    for row in range(HASH_HEIGHT):
+        offset = row * HASH_WIDTH
+        for col in range(HASH_WIDTH - 1):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+def _thumbnail_difference(a, b):
+    return sum(abs(x - y) for x, y in zip(a, b)) / len(a)
+
+class BKTree:
+    """Burkhard-Keller tree over hashes under Hamming distance"""
+
+    def __init__(self):
+        self.root = None
+
+    def add(self, value, item):
+        node = [value, item, {}]
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = hamming(value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def nearest(self, value, max_distance):
+        """Closest stored item within max_distance, or None"""
+        if self.root is None:
+            return None
+        best = None
+        best_distance = max_distance + 1
+        pending = [self.root]
+        while pending:
+            node_value, item, children = pending.pop()
+            distance = hamming(value, node_value)
+            if distance < best_distance:
+                best, best_distance = item, distance
+            # Triangle inequality: only subtrees at distance d +- radius can match
+            for edge, child in children.items():
+                if distance - best_distance < edge < distance + best_distance:
+                    pending.append(child)
+        return best
+
+def cluster_frames(sources, max_distance=DEFAULT_MAX_DISTANCE):
+    """Group near-duplicate frames.
+
+    Returns a list of clusters, each a list of indices into sources whose
+    first entry is the representative to analyze. Frames that cannot be
+    hashed, and featureless ones, are kept as clusters of their own.
+    """
+    tree = BKTree()
+    clusters = []
+    thumbnails = {}  # Cluster index -> its representative's thumbnail
+
+    for index, source in enumerate(sources):
+        try:
+            pixels, detail = _thumbnail(source)
+        except Exception as e:
+            print(f"Error hashing image {getattr(source, 'filename', source)}: {e}")
+            clusters.append([index])
+            continue
+        finally:
+            if hasattr(source, 'seek'):
+                source.seek(0)
+
+        if detail < MIN_DETAIL_STD:
+            clusters.append([index])
+            continue
+
+        value = _difference_hash(pixels)
+        match = tree.nearest(value, max_distance)
+        if match is not None and _thumbnail_difference(pixels, thumbnails[match]) > MAX_THUMBNAIL_DIFFERENCE:
+            match = None
+        if match is None:
+            tree.add(value, len(clusters))
+            thumbnails[len(clusters)] = pixels
+            clusters.append([index])
+        else:
+            clusters[match].append(index)
+
+    return clusters
+
+def describe_clusters(clusters, names):
+    """Summarize cluster membership for the analysis results"""
+    return {
+        'frame_clusters': [
+            {
+                'representative': names[cluster[0]],
+                'duplicates': [names[index] for index in cluster[1:]]
+            }
+            for cluster in clusters if len(cluster) > 1
+        ],
+        'frames_skipped': [names[index] for cluster in clusters for index in cluster[1:]]
+    }
@@ -0,0 +1,179 @@
+"""Header-only drone frame metadata and flight-aware frame grouping.
+
+Image.open only parses a JPEG's markers, so the EXIF GPS tags and the XMP
+packet drones write (gimbal pitch and yaw, height above take-off) are read
+without decoding any pixels. plan_frames uses them to classify each frame's
+camera view, merge frames shot from the same spot in the same direction,
+and then merge visually near-identical frames of the same view with
+frame_dedup. Frames without metadata fall back to visual grouping alone and
+run every detector.
+"""
+import math
+import re
+from PIL import Image
+import analysis_rules as rules
+import frame_dedup
+
+# Frames closer than this horizontally, at similar height and heading,
+# see the same surfaces
+POSITION_RADIUS_M = 3.0
+ALTITUDE_TOLERANCE_M = 3.0
+YAW_TOLERANCE_DEG = 20.0
+
+EARTH_RADIUS_M = 6371000.0
+
+GPS_IFD = 0x8825
+
+# XMP attributes (or elements) written by DJI and similar flight apps
+_XMP_FIELDS = {
+    'pitch': (b'GimbalPitchDegree', b'CameraPitch'),
+    'yaw': (b'GimbalYawDegree', b'FlightYawDegree', b'CameraYaw'),
+    'relative_altitude': (b'RelativeAltitude',)
+}
+_XMP_PATTERNS = {
+    field: [re.compile(rb'\w+:' + name + rb'\s*(?:=\s*"|>)\s*([+-]?\d+(?:\.\d+)?)') for name in names]
+    for field, names in _XMP_FIELDS.items()
+}
+
+def _xmp_value(xmp, field):
+    for pattern in _XMP_PATTERNS[field]:
+        match = pattern.search(xmp)
+        if match:
+            return float(match.group(1))
+    return None
+
+def _degrees(value, ref):
+    degrees, minutes, seconds = (float(part) for part in value)
+    decimal = degrees + minutes / 60 + seconds / 3600
+    return -decimal if ref in ('S', 'W') else decimal
+
+def read_metadata(source):
+    """Gimbal pitch/yaw, GPS position and altitude of one frame.
+
+    Missing values are None. Only the file's header is read; file objects
+    are rewound afterwards.
+    """
+    metadata = {'pitch': None, 'yaw': None, 'lat': None, 'lon': None, 'altitude': None}
+    try:
+        with Image.open(source) as img:
+            xmp = img.info.get('xmp') or b''
+            if isinstance(xmp, str):
+                xmp = xmp.encode('utf-8', 'replace')
+            metadata['pitch'] = _xmp_value(xmp, 'pitch')
+            metadata['yaw'] = _xmp_value(xmp, 'yaw')
+            relative_altitude = _xmp_value(xmp, 'relative_altitude')
+
+            gps = img.getexif().get_ifd(GPS_IFD)
+            if 2 in gps and 4 in gps:
+                metadata['lat'] = _degrees(gps[2], gps.get(1, 'N'))
+                metadata['lon'] = _degrees(gps[4], gps.get(3, 'E'))
+            # Height above take-off compares frames of one flight better
+            # than GPS altitude, which drifts by metres
+            if relative_altitude is not None:
+                metadata['altitude'] = relative_altitude
+            elif 6 in gps:
+                metadata['altitude'] = -float(gps[6]) if gps.get(5) == 1 else float(gps[6])
+    except Exception as e:
+        print(f"Error reading metadata of {getattr(source, 'filename', source)}: {e}")
+    finally:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+
+    metadata['view'] = rules.classify_view(metadata['pitch'])
+    return metadata
+
+def _yaw_difference(a, b):
+    difference = abs(a - b) % 360
+    return min(difference, 360 - difference)
+
+def _same_spot(a, b):
+    if a['altitude'] is not None and b['altitude'] is not None \
+            and abs(a['altitude'] - b['altitude']) > ALTITUDE_TOLERANCE_M:
+        return False
+    if a['yaw'] is not None and b['yaw'] is not None \
+            and _yaw_difference(a['yaw'], b['yaw']) > YAW_TOLERANCE_DEG:
+        return False
+    return math.hypot(a['x'] - b['x'], a['y'] - b['y']) <= POSITION_RADIUS_M
+
+def group_by_position(frames):
+    """Group frames shot from the same spot with the same view and heading.
+
+    Returns clusters of indices into frames, representative first, like
+    frame_dedup.cluster_frames. Positions are projected to metres around
+    the first located frame and bucketed into a grid of POSITION_RADIUS_M
+    cells, so each frame is compared only with groups in its own and the
+    neighbouring cells.
+    """
+    located = [frame for frame in frames if frame['lat'] is not None]
+    if located:
+        origin_lat = math.radians(located[0]['lat'])
+        origin_lon = math.radians(located[0]['lon'])
+
+    clusters = []
+    grid = {}
+    for index, frame in enumerate(frames):
+        if frame['lat'] is None:
+            clusters.append([index])
+            continue
+
+        point = dict(frame,
+                     x=EARTH_RADIUS_M * (math.radians(frame['lon']) - origin_lon) * math.cos(origin_lat),
+                     y=EARTH_RADIUS_M * (math.radians(frame['lat']) - origin_lat))
+        cell_x = math.floor(point['x'] / POSITION_RADIUS_M)
+        cell_y = math.floor(point['y'] / POSITION_RADIUS_M)
+
+        match = None
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for representative, cluster_index in grid.get((frame['view'], cell_x + dx, cell_y + dy), ()):
+                    if _same_spot(point, representative):
+                        match = cluster_index
+                        break
+                if match is not None:
+                    break
+            if match is not None:
+                break
+
+        if match is None:
+            grid.setdefault((frame['view'], cell_x, cell_y), []).append((point, len(clusters)))
+            clusters.append([index])
+        else:
+            clusters[match].append(index)
+
+    return clusters
+
+def plan_frames(sources, max_distance=frame_dedup.DEFAULT_MAX_DISTANCE):
+    """Decide which frames to analyze and with which detectors.
+
+    Returns (clusters, views): clusters as from frame_dedup.cluster_frames,
+    and the camera view of each cluster's representative. Frames are first
+    grouped by position, then representatives of the same view are grouped
+    visually, so a nadir and an oblique frame are never merged.
+    """
+    frames = [read_metadata(source) for source in sources]
+    position_clusters = group_by_position(frames)
+
+    by_view = {}
+    for cluster in position_clusters:
+        by_view.setdefault(frames[cluster[0]]['view'], []).append(cluster)
+
+    clusters, views = [], []
+    for view, view_clusters in by_view.items():
+        visual = frame_dedup.cluster_frames([sources[cluster[0]] for cluster in view_clusters], max_distance)
+        for group in visual:
+            clusters.append([index for member in group for index in view_clusters[member]])
+            views.append(view)
+
+    # Keep the upload order of representatives for stable results
+    order = sorted(range(len(clusters)), key=lambda i: clusters[i][0])
+    return [clusters[i] for i in order], [views[i] for i in order]
+
+def describe_views(clusters, views):
+    """Per-view frame counts and detector runs for the analysis results"""
+    frame_views = {}
+    for cluster, view in zip(clusters, views):
+        frame_views[view] = frame_views.get(view, 0) + len(cluster)
+    return {
+        'frame_views': frame_views,
+        'detector_runs': sum(len(rules.VIEW_DETECTORS[view]) for view in views)
+    }
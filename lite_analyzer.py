@@ -0,0 +1,111 @@
+from PIL import Image, ImageEnhance, ImageStat, ImageChops
+import analysis_rules as rules
+import cost_tables
+import frame_dedup
+import frame_metadata
+import regional_costs
+
+class LiteAnalyzer:
+    """Pillow-only analysis backend for the serverless build.
+
+    Frames are decoded straight to a small proxy (JPEGs use the decoder's
+    DCT scaling, so only a fraction of the coefficients are ever expanded),
+    the same image statistics PropertyAnalyzer measures are taken on that
+    proxy, and the shared category rules turn them into issues.
+    """
+
+    # Longest side of the decoded proxy; the scale the full build measures
+    # roof texture at
+    PROXY_SIZE = rules.TEXTURE_SIZE
+
+    def __init__(self):
+        # Hamming distance under which overlapping frames count as duplicates
+        self.duplicate_distance = frame_dedup.DEFAULT_MAX_DISTANCE
+
+        # Pillow stores hue as 0-255 where OpenCV uses 0-179, so the green band
+        # is rescaled once into per-channel point() lookup tables
+        lower_h, lower_s, lower_v = rules.GREEN_HSV_LOWER
+        upper_h, upper_s, upper_v = rules.GREEN_HSV_UPPER
+        hue_scale = 255 / 180
+        self.green_luts = (
+            self._band_lut(int(round(lower_h * hue_scale)), int(round(upper_h * hue_scale))),
+            self._band_lut(lower_s, upper_s),
+            self._band_lut(lower_v, upper_v)
+        )
+
+    def _band_lut(self, lower, upper):
+        return [255 if lower <= value <= upper else 0 for value in range(256)]
+
+    def analyze_property(self, image_sources, property_address=None):
+        """Analyze uploaded images given as paths or readable file objects"""
+        all_issues = []
+        table = cost_tables.current()
+
+        # Group frames shot from the same spot or showing the same view, and
+        # analyze one representative of each with the detectors its view needs
+        clusters, views = frame_metadata.plan_frames(image_sources, self.duplicate_distance)
+        for cluster, view in zip(clusters, views):
+            all_issues.extend(self._analyze_single_image(image_sources[cluster[0]], table, view))
+
+        region = regional_costs.locate(property_address)
+        regional_costs.adjust_issues(all_issues, region)
+
+        analysis_results = rules.build_results(all_issues, len(image_sources), table)
+        analysis_results['region'] = region
+        analysis_results['unique_frames_analyzed'] = len(clusters)
+        analysis_results.update(frame_dedup.describe_clusters(
+            clusters, [getattr(source, 'filename', None) or f'image {index + 1}'
+                       for index, source in enumerate(image_sources)]))
+        analysis_results.update(frame_metadata.describe_views(clusters, views))
+
+        return analysis_results
+
+    def _analyze_single_image(self, source, table, view='unknown'):
+        """Analyze a single image with the detectors for its camera view"""
+        try:
+            proxy = self._load_proxy(source)
+            enhanced = self._enhance_image(proxy)
+
+            detectors = rules.VIEW_DETECTORS[view]
+            issues = []
+            if 'roof' in detectors:
+                gray_stats = ImageStat.Stat(enhanced.convert('L'))
+                issues.extend(rules.roof_issues(gray_stats.mean[0], gray_stats.stddev[0], table))
+            if 'siding' in detectors:
+                issues.extend(rules.siding_issues(table))
+            if 'landscaping' in detectors:
+                issues.extend(rules.landscaping_issues(self._green_ratio(enhanced), table))
+            if 'hardscaping' in detectors:
+                issues.extend(rules.hardscaping_issues(table))
+
+            return issues
+
+        except Exception as e:
+            print(f"Error analyzing image {getattr(source, 'filename', source)}: {e}")
+            return []
+
+    def _load_proxy(self, source):
+        """Decode an image at reduced resolution"""
+        img = Image.open(source)
+        # For JPEGs this selects a 1/2, 1/4 or 1/8 scale decode before any
+        # pixel data is read; other formats ignore it. Decoding at twice the
+        # proxy size and box-filtering down matches OpenCV's INTER_AREA
+        img.draft('RGB', (self.PROXY_SIZE * 2, self.PROXY_SIZE * 2))
+        img = img.convert('RGB')
+        img.thumbnail((self.PROXY_SIZE, self.PROXY_SIZE), Image.Resampling.BOX)
+        return img
+
+    def _enhance_image(self, pil_img):
+        """Enhance image quality for better analysis"""
+        enhanced = ImageEnhance.Contrast(pil_img).enhance(rules.CONTRAST_FACTOR)
+        enhanced = ImageEnhance.Brightness(enhanced).enhance(rules.BRIGHTNESS_FACTOR)
+        enhanced = ImageEnhance.Sharpness(enhanced).enhance(rules.SHARPNESS_FACTOR)
+        return enhanced
+
+    def _green_ratio(self, img):
+        """Fraction of pixels inside the vegetation HSV band"""
+        hue, saturation, value = img.convert('HSV').split()
+        hue_lut, saturation_lut, value_lut = self.green_luts
+        mask = ImageChops.multiply(hue.point(hue_lut), saturation.point(saturation_lut))
+        mask = ImageChops.multiply(mask, value.point(value_lut))
+        return mask.histogram()[255] / (img.width * img.height)
@@ -1,46 +1,135 @@
 import sys
 import os
+import io
+import base64
+import gzip
+from urllib.parse import urlencode
+from werkzeug.http import parse_set_header
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+# Imported once per container and reused across warm invocations
 from app import app
 
-def handler(event, context):
-    from werkzeug.wrappers import Request, Response
-    from werkzeug.serving import WSGIRequestHandler
-    import io
-    
-    # Simple WSGI wrapper for Netlify
+# Content types that can be returned to API Gateway as plain text; anything
+# else (PDFs, images, archives) is sent base64-encoded
+TEXT_CONTENT_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml'
+)
+
+# JSON bodies larger than this are gzipped when the client accepts it
+COMPRESS_MIN_BYTES = 1024
+
+def _is_text(content_type):
+    return content_type.split(';')[0].strip().lower().startswith(TEXT_CONTENT_TYPES)
+
+def _event_body(event):
+    """Return the raw request body as bytes"""
+    body = event.get('body') or ''
+    if event.get('isBase64Encoded'):
+        return base64.b64decode(body)
+    if isinstance(body, str):
+        return body.encode('utf-8')
+    return body
+
+def _event_query_string(event):
+    if event.get('rawQuery'):
+        return event['rawQuery']
+    params = event.get('multiValueQueryStringParameters')
+    if params:
+        return urlencode([(k, v) for k, values in params.items() for v in values])
+    return urlencode(event.get('queryStringParameters') or {})
+
+def _build_environ(event, body):
+    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
     environ = {
         'REQUEST_METHOD': event['httpMethod'],
+        'SCRIPT_NAME': '',
         'PATH_INFO': event['path'],
-        'QUERY_STRING': event.get('rawQuery', ''),
-        'CONTENT_TYPE': event.get('headers', {}).get('content-type', ''),
-        'CONTENT_LENGTH': str(len(event.get('body', ''))),
-        'SERVER_NAME': 'localhost',
-        'SERVER_PORT': '8000',
-        'wsgi.input': io.BytesIO(event.get('body', '').encode()),
+        'QUERY_STRING': _event_query_string(event),
+        'CONTENT_TYPE': headers.get('content-type', ''),
+        'CONTENT_LENGTH': str(len(body)),
+        'SERVER_NAME': headers.get('host', 'localhost').split(':')[0],
+        'SERVER_PORT': headers.get('x-forwarded-port', '443'),
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': headers.get('x-nf-client-connection-ip', ''),
+        'wsgi.input': io.BytesIO(body),
         'wsgi.errors': sys.stderr,
         'wsgi.version': (1, 0),
         'wsgi.multithread': False,
         'wsgi.multiprocess': True,
         'wsgi.run_once': False,
-        'wsgi.url_scheme': 'https'
+        'wsgi.url_scheme': headers.get('x-forwarded-proto', 'https')
     }
-    
+
     # Add headers to environ
-    for key, value in event.get('headers', {}).items():
+    for key, value in headers.items():
         key = key.upper().replace('-', '_')
         if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
             environ[f'HTTP_{key}'] = value
-    
+
+    return environ
+
+def handler(event, context):
+    body = _event_body(event)
+    environ = _build_environ(event, body)
+
     response_data = []
-    def start_response(status, headers):
-        response_data.extend([status, headers])
-    
+    def start_response(status, headers, exc_info=None):
+        response_data[:] = [status, headers]
+        return output.write
+
+    # Response chunks are written straight into one buffer instead of being
+    # collected into a list and joined, and work for both str and bytes bodies
+    output = io.BytesIO()
     result = app(environ, start_response)
-    
+    try:
+        for chunk in result:
+            if chunk:
+                output.write(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+
+    status, response_headers = response_data
+    headers = {}
+    multi_headers = {}
+    for key, value in response_headers:
+        multi_headers.setdefault(key, []).append(value)
+        headers[key] = value
+
+    payload = output.getvalue()
+    content_type = headers.get('Content-Type', '')
+    accept_encoding = environ.get('HTTP_ACCEPT_ENCODING', '')
+
+    if (content_type.startswith('application/json')
+            and len(payload) >= COMPRESS_MIN_BYTES
+            and 'gzip' in accept_encoding
+            and 'Content-Encoding' not in headers):
+        payload = gzip.compress(payload, compresslevel=6)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Content-Length'] = str(len(payload))
+        # Added to whatever the app already varies on, like response.vary.add
+        vary = parse_set_header(', '.join(multi_headers.get('Vary', [])))
+        vary.add('Accept-Encoding')
+        headers['Vary'] = vary.to_header()
+        for key in ('Content-Encoding', 'Content-Length', 'Vary'):
+            multi_headers[key] = [headers[key]]
+
+    if 'Content-Encoding' in headers or not _is_text(content_type):
+        response_body = base64.b64encode(payload).decode('ascii')
+        is_base64 = True
+    else:
+        response_body = payload.decode('utf-8')
+        is_base64 = False
+
     return {
-        'statusCode': int(response_data[0].split()[0]),
-        'headers': dict(response_data[1]),
-        'body': ''.join(result)
-    }
\ No newline at end of file
+        'statusCode': int(status.split()[0]),
+        'headers': headers,
+        'multiValueHeaders': multi_headers,
+        'body': response_body,
+        'isBase64Encoded': is_base64
+    }
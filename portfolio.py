@@ -0,0 +1,252 @@
+"""Cross-session analytics over every stored analysis.
+
+PortfolioIndex keeps one row per analyzed session in columnar NumPy arrays
+(session id, ZIP code and month as string columns, costs and scores as
+float columns) and answers group-by and percentile queries with vectorized
+operations. The columns are persisted to a local .npz file, along with the
+modification time of each session's analysis_results.json. refresh() only
+reads the results of sessions that are new or were rewritten since, and
+drops sessions that were deleted, so keeping the index current costs one
+directory listing, a stat per session and the changed sessions.
+"""
+import os
+import re
+import json
+import tempfile
+import threading
+import numpy as np
+import analysis_rules as rules
+from session_results import RESULTS_FILENAME
+from regional_costs import extract_zip
+
+STRING_COLUMNS = ['session_id', 'zip', 'month', 'address', 'upload_date']
+
+NUMERIC_COLUMNS = (
+    ['total_cost', 'condition_score', 'roi_percentage', 'value_increase',
+     'timeline_weeks', 'issue_count', 'images_analyzed']
+    + [f'{severity}_count' for severity in rules.SEVERITIES]
+    + [f'{category}_cost' for category in rules.COST_CATEGORIES]
+)
+
+# Kept per row to notice rewritten results; not a queryable metric
+MTIME_COLUMN = 'results_mtime'
+
+GROUP_KEYS = ['zip', 'month']
+AGGREGATES = ['count', 'sum', 'mean', 'min', 'max', 'median']
+
+# Placeholder addresses the upload forms fill in; never matched as a
+# repeat survey of anything
+PLACEHOLDER_ADDRESSES = {'unknown property'}
+
+def address_key(address):
+    """Property address normalized for matching repeat surveys"""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', (address or '').lower()).split())
+
+def _session_row(results):
+    summary = results.get('summary') or rules.build_rollup(results.get('issues_found', []))
+    row = {
+        'session_id': results.get('session_id', ''),
+        'zip': extract_zip(results.get('property_address')),
+        'month': (results.get('upload_date') or '')[:7],
+        'address': address_key(results.get('property_address')),
+        'upload_date': results.get('upload_date') or '',
+        'total_cost': results.get('total_estimated_cost', 0),
+        'condition_score': results.get('overall_condition_score', 0),
+        'roi_percentage': results.get('roi_percentage', 0),
+        'value_increase': results.get('potential_value_increase', 0),
+        'timeline_weeks': results.get('estimated_timeline_weeks', 0),
+        'issue_count': summary['issue_count'],
+        'images_analyzed': results.get('images_analyzed', 0)
+    }
+    for severity in rules.SEVERITIES:
+        row[f'{severity}_count'] = summary['severity_counts'].get(severity, 0)
+    for category in rules.COST_CATEGORIES:
+        row[f'{category}_cost'] = results.get('cost_breakdown', {}).get(category, 0)
+    return row
+
+class PortfolioIndex:
+    def __init__(self, upload_folder, cache_path=None):
+        self.upload_folder = upload_folder
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self.columns = {name: np.array([], dtype=str) for name in STRING_COLUMNS}
+        self.columns.update({name: np.array([], dtype=np.float64) for name in NUMERIC_COLUMNS + [MTIME_COLUMN]})
+
+        if cache_path and os.path.exists(cache_path):
+            self._load()
+
+    def __len__(self):
+        return len(self.columns['session_id'])
+
+    def _load(self):
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as data:
+                if set(data.files) != set(STRING_COLUMNS + NUMERIC_COLUMNS + [MTIME_COLUMN]):
+                    return  # Written by a different column layout; rebuild
+                self.columns = {name: data[name] for name in data.files}
+        except Exception as e:
+            print(f"Error loading portfolio index {self.cache_path}: {e}")
+
+    def _save(self):
+        # A temporary file of its own, so workers saving at the same time
+        # never write into each other's copy before it is swapped in
+        fd, tmp_path = tempfile.mkstemp(suffix='.npz', dir=os.path.dirname(self.cache_path) or '.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **self.columns)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Error saving portfolio index {self.cache_path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _scan(self):
+        """Modification time of every session's results, by session id"""
+        mtimes = {}
+        for entry in os.scandir(self.upload_folder):
+            if not entry.is_dir():
+                continue
+            # Sessions still uploading have no results yet; picked up later
+            try:
+                mtimes[entry.name] = os.path.getmtime(os.path.join(entry.path, RESULTS_FILENAME))
+            except OSError:
+                continue
+        return mtimes
+
+    def refresh(self):
+        """Bring the index up to date; returns how many sessions were added,
+        rewritten or removed"""
+        with self._lock:
+            try:
+                mtimes = self._scan()
+            except OSError:
+                return 0
+
+            indexed = dict(zip(self.columns['session_id'].tolist(), self.columns[MTIME_COLUMN].tolist()))
+            stale = {session_id for session_id, mtime in indexed.items() if mtimes.get(session_id) != mtime}
+
+            rows = []
+            for session_id, mtime in mtimes.items():
+                if session_id in indexed and session_id not in stale:
+                    continue
+                path = os.path.join(self.upload_folder, session_id, RESULTS_FILENAME)
+                try:
+                    with open(path, 'r') as f:
+                        results = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Error reading {path}: {e}")
+                    continue
+                row = _session_row(results)
+                row['session_id'] = session_id
+                row[MTIME_COLUMN] = mtime
+                rows.append(row)
+
+            if rows or stale:
+                # Built aside and swapped in whole so concurrent queries always
+                # see columns of equal length
+                keep = ~np.isin(self.columns['session_id'], list(stale)) if stale else slice(None)
+                columns = {}
+                for name in STRING_COLUMNS:
+                    columns[name] = np.concatenate([self.columns[name][keep], [row[name] for row in rows]])
+                for name in NUMERIC_COLUMNS + [MTIME_COLUMN]:
+                    new_values = np.array([row[name] for row in rows], dtype=np.float64)
+                    columns[name] = np.concatenate([self.columns[name][keep], new_values])
+                self.columns = columns
+                if self.cache_path:
+                    self._save()
+
+            return len(rows) + len(stale - {row['session_id'] for row in rows})
+
+    def summary(self, metric, percentiles=(10, 25, 50, 75, 90), bins=10):
+        """Distribution of one metric across every session"""
+        values = self._metric(self.columns, metric)
+        if values.size == 0:
+            return {'metric': metric, 'count': 0}
+
+        counts, edges = np.histogram(values, bins=bins)
+        return {
+            'metric': metric,
+            'count': int(values.size),
+            'mean': float(values.mean()),
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'percentiles': dict(zip([f'{q:g}' for q in percentiles],
+                                    np.percentile(values, percentiles).tolist())),
+            'histogram': {'counts': counts.tolist(), 'edges': edges.tolist()}
+        }
+
+    def group_by(self, key, metric, aggregate='mean', percentiles=()):
+        """Aggregate a metric per ZIP code or month.
+
+        Each group gets the requested aggregate plus any requested
+        percentiles, all computed without a Python-level loop over sessions.
+        """
+        if key not in GROUP_KEYS:
+            raise ValueError(f"Unknown group key '{key}'")
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{aggregate}'")
+
+        columns = self.columns
+        values = self._metric(columns, metric)
+        labels, inverse = np.unique(columns[key], return_inverse=True)
+        if values.size == 0:
+            return {'group_by': key, 'metric': metric, 'aggregate': aggregate, 'groups': []}
+
+        counts = np.bincount(inverse, minlength=len(labels))
+        sums = np.bincount(inverse, weights=values, minlength=len(labels))
+
+        # Sort by (group, value) once; every order statistic is then an
+        # index into the sorted values
+        order = np.lexsort((values, inverse))
+        sorted_values = values[order]
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+        def quantile(q):
+            position = starts + (counts - 1) * (q / 100.0)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            fraction = position - lower
+            return sorted_values[lower] * (1 - fraction) + sorted_values[upper] * fraction
+
+        if aggregate == 'count':
+            aggregated = counts.astype(np.float64)
+        elif aggregate == 'sum':
+            aggregated = sums
+        elif aggregate == 'mean':
+            aggregated = sums / counts
+        elif aggregate == 'min':
+            aggregated = sorted_values[starts]
+        elif aggregate == 'max':
+            aggregated = sorted_values[starts + counts - 1]
+        else:
+            aggregated = quantile(50)
+
+        group_percentiles = {f'{q:g}': quantile(q) for q in percentiles}
+
+        groups = []
+        for i, label in enumerate(labels.tolist()):
+            group = {'key': label or 'unknown', 'count': int(counts[i]), aggregate: float(aggregated[i])}
+            if group_percentiles:
+                group['percentiles'] = {q: float(v[i]) for q, v in group_percentiles.items()}
+            groups.append(group)
+
+        return {'group_by': key, 'metric': metric, 'aggregate': aggregate, 'groups': groups}
+
+    def latest_session(self, address, exclude=None):
+        """Most recently analyzed session for the same address, or None"""
+        key = address_key(address)
+        if not key or key in PLACEHOLDER_ADDRESSES:
+            return None
+        columns = self.columns
+        matches = np.nonzero((columns['address'] == key) & (columns['session_id'] != (exclude or '')))[0]
+        if matches.size == 0:
+            return None
+        latest = matches[np.argmax(columns['upload_date'][matches])]
+        return str(columns['session_id'][latest])
+
+    def _metric(self, columns, metric):
+        if metric not in NUMERIC_COLUMNS:
+            raise ValueError(f"Unknown metric '{metric}'")
+        return columns[metric]
@@ -1,98 +1,175 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
 import cv2
 import numpy as np
-from PIL import Image, ImageEnhance
-import random
-import math
-from datetime import datetime
+import analysis_rules as rules
+import cost_tables
+import frame_dedup
+import frame_metadata
+import regional_costs
+import video_frames
+from buffer_pool import BufferPool, peak_rss_mb
+from color_stats import FrameInputs
+from detector_registry import Budget, DetectorRegistry, new_run_counts, count_runs
+
+# Detectors run by PropertyAnalyzer, in the order their issues are reported
+DETECTORS = DetectorRegistry()
+
+# PIL's ImageFilter.SMOOTH kernel, which ImageEnhance.Sharpness blends with
+SMOOTH_KERNEL = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], dtype=np.float32) / 13
 
 class PropertyAnalyzer:
+    # Per-frame issue lists kept for frames seen again (re-runs, API calls)
+    FRAME_CACHE_SIZE = 512
+    
+    # Detector time per frame in milliseconds; optional detectors are
+    # downgraded to REDUCED_SCALE or skipped once it (or the request
+    # budget passed to analyze_property) runs out
+    FRAME_BUDGET_MS = 1500
+    REDUCED_SCALE = 0.5
+    
+    # Idle per-frame working buffers kept for the next frame
+    BUFFER_POOL_BYTES = 384 * 1024 * 1024
+    
     def __init__(self):
-        self.cost_ranges = {
-            'roof': {'min': 5000, 'max': 25000, 'default': 12000},
-            'siding': {'min': 8000, 'max': 15000, 'default': 11000},
-            'landscaping': {'min': 2000, 'max': 10000, 'default': 5000},
-            'hardscaping': {'min': 3000, 'max': 8000, 'default': 5500},
-            'windows': {'min': 2000, 'max': 12000, 'default': 6000},
-            'gutters': {'min': 1000, 'max': 3000, 'default': 1800}
-        }
-        
-    def analyze_property(self, image_paths):
-        """Main analysis function that processes all uploaded images"""
-        analysis_results = {
-            'images_analyzed': len(image_paths),
-            'issues_found': [],
-            'issues_by_category': {
-                'roof': [],
-                'siding': [],
-                'landscaping': [],
-                'hardscaping': []
-            },
-            'cost_breakdown': {
-                'roof': 0,
-                'siding': 0,
-                'landscaping': 0,
-                'hardscaping': 0,
-                'windows': 0,
-                'gutters': 0
-            },
-            'total_estimated_cost': 0,
-            'overall_condition_score': 0,
-            'estimated_timeline_weeks': 0,
-            'potential_value_increase': 0,
-            'roi_percentage': 0,
-            'payback_years': 0
-        }
+        # Hamming distance under which overlapping frames count as duplicates
+        self.duplicate_distance = frame_dedup.DEFAULT_MAX_DISTANCE
         
-        all_issues = []
+        # Keyed by (frame content digest, cost table version) so a price
+        # update invalidates exactly the entries computed under old prices
+        self._frame_cache = OrderedDict()
+        self._frame_cache_lock = threading.Lock()
         
-        # Analyze each image
-        for image_path in image_paths:
-            image_issues = self._analyze_single_image(image_path)
-            all_issues.extend(image_issues)
+        self._buffers = BufferPool(self.BUFFER_POOL_BYTES)
         
-        # Process and categorize issues
-        categorized_issues = self._categorize_issues(all_issues)
-        analysis_results['issues_by_category'] = categorized_issues
-        analysis_results['issues_found'] = all_issues
+    def analyze_property(self, image_paths, property_address=None, video_paths=(), max_dimension=None,
+                         budget_ms=None, previous_survey=None, checkpoint=None):
+        """Main analysis function that processes all uploaded images and videos.
         
-        # Calculate costs
-        cost_breakdown = self._calculate_costs(categorized_issues)
-        analysis_results['cost_breakdown'] = cost_breakdown
-        analysis_results['total_estimated_cost'] = sum(cost_breakdown.values())
+        With a change_detection.PreviousSurvey of the same property, photos
+        are registered against it and only what changed is re-analyzed.
         
-        # Calculate other metrics
-        analysis_results['overall_condition_score'] = self._calculate_condition_score(all_issues)
-        analysis_results['estimated_timeline_weeks'] = self._estimate_timeline(all_issues)
-        analysis_results['potential_value_increase'] = self._estimate_value_increase(analysis_results['total_estimated_cost'])
-        analysis_results['roi_percentage'] = self._calculate_roi(analysis_results['total_estimated_cost'], analysis_results['potential_value_increase'])
-        analysis_results['payback_years'] = self._calculate_payback_period(analysis_results['roi_percentage'])
+        checkpoint, if given, is a persistent store of per-frame issues with
+        get(key) and put(key, issues): photos it already holds are not
+        analyzed again, and newly analyzed ones are added to it.
+        """
+        all_issues = []
+        
+        # Shared by every frame of the request; None leaves it unlimited
+        budget = Budget(budget_ms)
+        runs = new_run_counts(DETECTORS)
+        
+        # One cost table for the whole session, even if it is reloaded midway
+        table = cost_tables.current()
+        
+        # Priced for the property's region before anything is totalled
+        region = regional_costs.locate(property_address)
+        
+        # Issues carried over from a previous survey are already priced, so
+        # they must have been priced the same way
+        if previous_survey is not None and not previous_survey.compatible(table.version, region):
+            print(f"Previous survey {previous_survey.session_id} used other prices; analyzing from scratch")
+            previous_survey = None
+        changes = {'unchanged': 0, 'changed': 0, 'new': 0}
+        reused = []
+        
+        # Group frames shot from the same spot or showing the same view, and
+        # analyze one representative of each with the detectors its view needs
+        clusters, views = frame_metadata.plan_frames(image_paths, self.duplicate_distance)
+        frames = []
+        for cluster, view in zip(clusters, views):
+            image_path = image_paths[cluster[0]]
+            if previous_survey is not None:
+                image_issues, carried, outcome = self._analyze_changes(image_path, table, view, budget, runs,
+                                                                       previous_survey, checkpoint)
+                changes[outcome] += 1
+                reused.extend(carried)
+                image_issues = carried + image_issues
+            else:
+                image_issues = self._analyze_single_image(image_path, table, view, budget, runs, checkpoint)
+            
+            # Which issues came from which photo, for the next survey
+            frames.append({'name': os.path.basename(image_path), 'view': view,
+                           'issues': list(range(len(all_issues), len(all_issues) + len(image_issues)))})
+            all_issues.extend(image_issues)
+        
+        # Video keyframes are decoded in a background thread while the
+        # previous keyframe is analyzed; sampling already drops redundant ones
+        videos = []
+        for video_path in video_paths:
+            sampler = video_frames.KeyframeSampler(video_path, max_dimension)
+            for name, frame in video_frames.prefetch(sampler):
+                try:
+                    issues, modes = self._analyze_frame(frame, table, 'unknown', budget)
+                    count_runs(runs, modes)
+                    all_issues.extend(issues)
+                except Exception as e:
+                    print(f"Error analyzing frame {name}: {e}")
+            videos.append(sampler.stats)
+        keyframes = sum(video['keyframes'] for video in videos)
+        
+        reused_ids = {id(issue) for issue in reused}
+        regional_costs.adjust_issues([issue for issue in all_issues if id(issue) not in reused_ids], region)
+        
+        analysis_results = rules.build_results(all_issues, len(image_paths) + keyframes, table)
+        analysis_results['region'] = region
+        analysis_results['unique_frames_analyzed'] = len(clusters) + keyframes
+        if videos:
+            analysis_results['videos'] = videos
+        analysis_results.update(frame_dedup.describe_clusters(
+            clusters, [os.path.basename(path) for path in image_paths]))
+        analysis_results.update(frame_metadata.describe_views(clusters, views))
+        analysis_results['detectors'] = runs
+        analysis_results['frames'] = frames
+        analysis_results['memory'] = {'peak_rss_mb': peak_rss_mb(), 'buffer_pool': self._buffers.stats()}
+        if previous_survey is not None:
+            analysis_results['change_detection'] = {
+                'previous_session': previous_survey.session_id,
+                'frames': changes,
+                'issues_reused': len(reused)
+            }
         
         return analysis_results
     
-    def _analyze_single_image(self, image_path):
-        """Analyze a single image and detect issues"""
+    def _analyze_single_image(self, image_path, table, view='unknown', budget=None, runs=None, checkpoint=None,
+                              img=None):
+        """Analyze a single image with the detectors for its camera view.
+        
+        img is the already decoded frame, if the caller has it.
+        """
         try:
+            cache_key = (self._frame_digest(image_path), table.version, view)
+            with self._frame_cache_lock:
+                cached = self._frame_cache.get(cache_key)
+                if cached is not None:
+                    self._frame_cache.move_to_end(cache_key)
+            if cached is None and checkpoint is not None:
+                cached = checkpoint.get(cache_key)
+            if cached is not None:
+                if checkpoint is not None:
+                    checkpoint.put(cache_key, cached)
+                return [dict(issue) for issue in cached]
+            
             # Load image
-            img = cv2.imread(image_path)
+            if img is None:
+                img = cv2.imread(image_path)
             if img is None:
                 return []
-                
-            # Convert to RGB for PIL
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            pil_img = Image.fromarray(img_rgb)
             
-            # Enhance image for better analysis
-            enhanced_img = self._enhance_image(pil_img)
-            
-            # Convert back to OpenCV format
-            enhanced_cv = cv2.cvtColor(np.array(enhanced_img), cv2.COLOR_RGB2BGR)
+            issues, modes = self._analyze_frame(img, table, view, budget or Budget())
+            if runs is not None:
+                count_runs(runs, modes)
             
-            # Analyze different aspects of the property
-            issues = []
-            issues.extend(self._analyze_roof_condition(enhanced_cv))
-            issues.extend(self._analyze_siding_condition(enhanced_cv))
-            issues.extend(self._analyze_landscaping(enhanced_cv))
-            issues.extend(self._analyze_hardscaping(enhanced_cv))
+            # Results cut short by the budget are not reused for later requests
+            if all(mode == 'full' for mode in modes.values()):
+                with self._frame_cache_lock:
+                    self._frame_cache[cache_key] = [dict(issue) for issue in issues]
+                    if len(self._frame_cache) > self.FRAME_CACHE_SIZE:
+                        self._frame_cache.popitem(last=False)
+                if checkpoint is not None:
+                    checkpoint.put(cache_key, issues)
             
             return issues
             
@@ -100,352 +177,143 @@ class PropertyAnalyzer:
             print(f"Error analyzing image {image_path}: {e}")
             return []
     
-    def _enhance_image(self, pil_img):
-        """Enhance image quality for better analysis"""
-        # Enhance contrast
-        enhancer = ImageEnhance.Contrast(pil_img)
-        enhanced = enhancer.enhance(1.2)
+    def _analyze_changes(self, image_path, table, view, budget, runs, survey, checkpoint=None):
+        """Analyze a photo against the previous survey of the property.
+        
+        Returns (new issues, issues carried over, outcome), where outcome is
+        unchanged, changed or new (no matching earlier photo). Issues are
+        not located within a photo, so a photo with any changed tile is
+        analyzed again in full rather than merged with its earlier findings.
+        """
+        img = None
+        try:
+            img = cv2.imread(image_path)
+            registration = survey.register(image_path, img, view) if img is not None else None
+        except Exception as e:
+            print(f"Error registering {image_path} against the previous survey: {e}")
+            registration = None
+        
+        if registration is not None and not registration.changed:
+            return [], registration.issues, 'unchanged'
+        
+        outcome = 'new' if registration is None else 'changed'
+        return self._analyze_single_image(image_path, table, view, budget, runs, checkpoint, img), [], outcome
+    
+    def _analyze_frame(self, img, table, view, budget):
+        """Run the detectors for a view on one decoded BGR frame.
         
-        # Enhance brightness
-        enhancer = ImageEnhance.Brightness(enhanced)
-        enhanced = enhancer.enhance(1.1)
+        Returns the issues and how each detector ran (full, reduced, skipped).
+        """
+        frame_budget = Budget(self.FRAME_BUDGET_MS)
         
-        # Enhance sharpness
-        enhancer = ImageEnhance.Sharpness(enhanced)
-        enhanced = enhancer.enhance(1.1)
+        # Every working array of the frame comes from the buffer pool and
+        # goes back to it once the detectors are done
+        with self._buffers.lease() as lease:
+            # Enhance image for better analysis
+            enhanced = self._enhance_image(img, lease)
+            
+            # Colour conversions and histograms are computed once per frame,
+            # when the first detector that declares them runs
+            inputs = FrameInputs(enhanced, lease, lambda: self._texture_gray(img, lease))
+            
+            # Analyze the aspects of the property this view can show
+            return DETECTORS.run(self, rules.VIEW_DETECTORS[view], inputs,
+                                 lambda: inputs.reduced(self.REDUCED_SCALE),
+                                 table, frame_budget, budget)
+    
+    def _texture_gray(self, img, lease):
+        """Enhanced grayscale copy of a frame at rules.TEXTURE_SIZE.
+        
+        Downscaled before enhancing, as LiteAnalyzer's proxy is, so both
+        builds measure roof texture at the same scale.
+        """
+        height, width = img.shape[:2]
+        scale = min(1.0, rules.TEXTURE_SIZE / max(height, width))
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        small = cv2.resize(img, size, dst=lease.take((size[1], size[0]) + img.shape[2:]),
+                           interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(self._enhance_image(small, lease), cv2.COLOR_BGR2GRAY)
+    
+    def _frame_digest(self, image_path):
+        """Content digest of an image file"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(image_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _enhance_image(self, img, lease):
+        """Enhance image quality for better analysis.
+        
+        The same blends as PIL's ImageEnhance, applied to the BGR frame in
+        place in one pooled buffer rather than through RGB and PIL copies.
+        """
+        enhanced = lease.take(img.shape)
+        
+        # Enhance contrast: blend with the frame's mean gray level
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=lease.take(img.shape[:2]))
+        mean = int(gray.mean() + 0.5)
+        cv2.addWeighted(img, rules.CONTRAST_FACTOR, img, 0, mean * (1 - rules.CONTRAST_FACTOR), dst=enhanced)
+        
+        # Enhance brightness: blend with black
+        cv2.addWeighted(enhanced, rules.BRIGHTNESS_FACTOR, enhanced, 0, 0, dst=enhanced)
+        
+        # Enhance sharpness: blend with a smoothed copy
+        smoothed = cv2.filter2D(enhanced, -1, SMOOTH_KERNEL, dst=lease.take(img.shape),
+                                borderType=cv2.BORDER_REPLICATE)
+        cv2.addWeighted(enhanced, rules.SHARPNESS_FACTOR, smoothed, 1 - rules.SHARPNESS_FACTOR, 0, dst=enhanced)
         
         return enhanced
     
-    def _analyze_roof_condition(self, img):
+    @DETECTORS.register('roof', category='roof', inputs=('edges', 'stats', 'texture_std'), cost_ms=40)
+    def _analyze_roof_condition(self, edges, stats, texture_std, table):
         """Analyze roof condition using computer vision techniques"""
         issues = []
         
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Edge detection to find roof lines and potential damage
-        edges = cv2.Canny(gray, 50, 150)
-        
         # Find contours (potential damaged areas)
         contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
-        # Simulate roof analysis based on image characteristics
-        height, width = img.shape[:2]
-        
         # Simulate various roof issues based on image analysis
-        roof_issues = self._simulate_roof_issues(gray, width, height)
+        roof_issues = self._simulate_roof_issues(stats, texture_std, table)
         issues.extend(roof_issues)
         
         return issues
     
-    def _simulate_roof_issues(self, gray_img, width, height):
+    def _simulate_roof_issues(self, stats, texture_std, table):
         """Simulate realistic roof issue detection"""
-        issues = []
-        
-        # Calculate image statistics for realistic simulation
-        mean_intensity = np.mean(gray_img)
-        std_intensity = np.std(gray_img)
-        
-        # Simulate different roof conditions based on image characteristics
-        if mean_intensity < 100:  # Darker areas might indicate damage
-            issues.append({
-                'category': 'roof',
-                'description': 'Potential roof damage detected in darker areas',
-                'severity': 'high',
-                'confidence': 0.75,
-                'estimated_cost': random.randint(8000, 15000),
-                'cost_range': {'min': 8000, 'max': 15000},
-                'recommendation': 'Professional roof inspection recommended'
-            })
-        
-        if std_intensity > 50:  # High variation might indicate wear
-            issues.append({
-                'category': 'roof',
-                'description': 'Uneven roof surface indicating potential wear',
-                'severity': 'medium',
-                'confidence': 0.65,
-                'estimated_cost': random.randint(3000, 8000),
-                'cost_range': {'min': 3000, 'max': 8000},
-                'recommendation': 'Monitor condition and plan for maintenance'
-            })
-        
-        # Randomly add common roof issues for demonstration
-        common_issues = [
-            {
-                'description': 'Missing or damaged shingles observed',
-                'severity': 'high',
-                'cost_range': {'min': 5000, 'max': 12000}
-            },
-            {
-                'description': 'Gutter system needs attention',
-                'severity': 'medium',
-                'cost_range': {'min': 1500, 'max': 3500}
-            },
-            {
-                'description': 'Roof aging showing wear patterns',
-                'severity': 'low',
-                'cost_range': {'min': 2000, 'max': 6000}
-            }
-        ]
-        
-        # Add 1-2 random issues for demonstration
-        for _ in range(random.randint(1, 2)):
-            issue = random.choice(common_issues)
-            cost = random.randint(issue['cost_range']['min'], issue['cost_range']['max'])
-            issues.append({
-                'category': 'roof',
-                'description': issue['description'],
-                'severity': issue['severity'],
-                'confidence': random.uniform(0.6, 0.9),
-                'estimated_cost': cost,
-                'cost_range': issue['cost_range'],
-                'recommendation': self._get_recommendation(issue['severity'])
-            })
-        
-        return issues
+        # Intensity mean comes from the frame's gray histogram; spread from
+        # the TEXTURE_SIZE copy, so it matches the Vercel build's
+        return rules.roof_issues(stats.mean, texture_std, table)
     
-    def _analyze_siding_condition(self, img):
+    @DETECTORS.register('siding', category='siding', inputs=('stats',), cost_ms=5)
+    def _analyze_siding_condition(self, stats, table):
         """Analyze exterior siding condition"""
         issues = []
         
-        # Convert to different color spaces for analysis
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Simulate siding analysis
-        siding_issues = [
-            {
-                'description': 'Exterior paint showing signs of weathering',
-                'severity': 'medium',
-                'cost_range': {'min': 4000, 'max': 8000}
-            },
-            {
-                'description': 'Siding material needs maintenance',
-                'severity': 'low',
-                'cost_range': {'min': 2000, 'max': 5000}
-            },
-            {
-                'description': 'Window trim requires attention',
-                'severity': 'medium',
-                'cost_range': {'min': 1500, 'max': 3000}
-            }
-        ]
-        
         # Add siding issues based on analysis
-        if random.random() > 0.3:  # 70% chance of finding siding issues
-            issue = random.choice(siding_issues)
-            cost = random.randint(issue['cost_range']['min'], issue['cost_range']['max'])
-            issues.append({
-                'category': 'siding',
-                'description': issue['description'],
-                'severity': issue['severity'],
-                'confidence': random.uniform(0.5, 0.8),
-                'estimated_cost': cost,
-                'cost_range': issue['cost_range'],
-                'recommendation': self._get_recommendation(issue['severity'])
-            })
+        issues.extend(rules.siding_issues(table))
         
         return issues
     
-    def _analyze_landscaping(self, img):
+    @DETECTORS.register('landscaping', category='landscaping', inputs=('stats',), cost_ms=60, optional=True)
+    def _analyze_landscaping(self, stats, table):
         """Analyze landscaping condition"""
         issues = []
         
-        # Convert to HSV for vegetation analysis
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        
-        # Create mask for green areas (vegetation)
-        lower_green = np.array([40, 40, 40])
-        upper_green = np.array([80, 255, 255])
-        green_mask = cv2.inRange(hsv, lower_green, upper_green)
-        green_percentage = np.sum(green_mask > 0) / (green_mask.shape[0] * green_mask.shape[1])
-        
-        landscaping_issues = [
-            {
-                'description': 'Lawn maintenance and reseeding needed',
-                'severity': 'medium',
-                'cost_range': {'min': 1500, 'max': 4000}
-            },
-            {
-                'description': 'Overgrown vegetation requires trimming',
-                'severity': 'low',
-                'cost_range': {'min': 800, 'max': 2000}
-            },
-            {
-                'description': 'Garden beds need landscaping attention',
-                'severity': 'medium',
-                'cost_range': {'min': 2000, 'max': 5000}
-            }
-        ]
+        # Vegetation coverage from the frame's HSV histogram
+        green_percentage = stats.band_ratio(rules.GREEN_HSV_LOWER, rules.GREEN_HSV_UPPER)
         
         # Determine landscaping issues based on green coverage
-        if green_percentage < 0.1:  # Low vegetation
-            issue = {
-                'description': 'Limited landscaping - property needs significant garden development',
-                'severity': 'medium',
-                'cost_range': {'min': 3000, 'max': 8000}
-            }
-        elif green_percentage > 0.4:  # High vegetation
-            issue = {
-                'description': 'Overgrown landscaping requires professional maintenance',
-                'severity': 'low',
-                'cost_range': {'min': 1000, 'max': 3000}
-            }
-        else:
-            issue = random.choice(landscaping_issues)
-        
-        cost = random.randint(issue['cost_range']['min'], issue['cost_range']['max'])
-        issues.append({
-            'category': 'landscaping',
-            'description': issue['description'],
-            'severity': issue['severity'],
-            'confidence': random.uniform(0.6, 0.85),
-            'estimated_cost': cost,
-            'cost_range': issue['cost_range'],
-            'recommendation': self._get_recommendation(issue['severity'])
-        })
+        issues.extend(rules.landscaping_issues(green_percentage, table))
         
         return issues
     
-    def _analyze_hardscaping(self, img):
+    @DETECTORS.register('hardscaping', category='hardscaping', inputs=('stats',), cost_ms=5, optional=True)
+    def _analyze_hardscaping(self, stats, table):
         """Analyze hardscaping elements (driveways, walkways, etc.)"""
         issues = []
         
-        # Convert to grayscale for hardscape analysis
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        hardscaping_issues = [
-            {
-                'description': 'Driveway surface showing cracks and wear',
-                'severity': 'medium',
-                'cost_range': {'min': 2500, 'max': 6000}
-            },
-            {
-                'description': 'Walkway maintenance required',
-                'severity': 'low',
-                'cost_range': {'min': 1000, 'max': 3000}
-            },
-            {
-                'description': 'Patio or deck needs refurbishment',
-                'severity': 'medium',
-                'cost_range': {'min': 3000, 'max': 7000}
-            }
-        ]
-        
         # Add hardscaping issues randomly
-        if random.random() > 0.4:  # 60% chance
-            issue = random.choice(hardscaping_issues)
-            cost = random.randint(issue['cost_range']['min'], issue['cost_range']['max'])
-            issues.append({
-                'category': 'hardscaping',
-                'description': issue['description'],
-                'severity': issue['severity'],
-                'confidence': random.uniform(0.55, 0.8),
-                'estimated_cost': cost,
-                'cost_range': issue['cost_range'],
-                'recommendation': self._get_recommendation(issue['severity'])
-            })
+        issues.extend(rules.hardscaping_issues(table))
         
         return issues
-    
-    def _categorize_issues(self, all_issues):
-        """Categorize issues by type"""
-        categorized = {
-            'roof': [],
-            'siding': [],
-            'landscaping': [],
-            'hardscaping': []
-        }
-        
-        for issue in all_issues:
-            category = issue.get('category', 'other')
-            if category in categorized:
-                categorized[category].append(issue)
-        
-        return categorized
-    
-    def _calculate_costs(self, categorized_issues):
-        """Calculate total costs by category"""
-        cost_breakdown = {
-            'roof': 0,
-            'siding': 0,
-            'landscaping': 0,
-            'hardscaping': 0,
-            'windows': 0,
-            'gutters': 0
-        }
-        
-        for category, issues in categorized_issues.items():
-            total_cost = sum(issue['estimated_cost'] for issue in issues)
-            if category in cost_breakdown:
-                cost_breakdown[category] = total_cost
-        
-        return cost_breakdown
-    
-    def _calculate_condition_score(self, all_issues):
-        """Calculate overall property condition score (1-10)"""
-        if not all_issues:
-            return 8  # Good condition if no issues found
-        
-        # Calculate score based on severity and number of issues
-        severity_weights = {'high': 3, 'medium': 2, 'low': 1}
-        total_severity = sum(severity_weights.get(issue['severity'], 1) for issue in all_issues)
-        
-        # Scale to 1-10 (higher is better)
-        max_possible_severity = len(all_issues) * 3
-        if max_possible_severity > 0:
-            severity_ratio = total_severity / max_possible_severity
-            score = max(1, 10 - (severity_ratio * 6))  # Scale to 1-10 range
-        else:
-            score = 8
-        
-        return round(score, 1)
-    
-    def _estimate_timeline(self, all_issues):
-        """Estimate timeline in weeks for all repairs"""
-        if not all_issues:
-            return 0
-        
-        # Base timeline by severity
-        timeline_by_severity = {'high': 3, 'medium': 2, 'low': 1}
-        total_weeks = 0
-        
-        for issue in all_issues:
-            weeks = timeline_by_severity.get(issue['severity'], 1)
-            total_weeks += weeks
-        
-        # Add some overlap consideration (reduce by 20%)
-        total_weeks = max(1, int(total_weeks * 0.8))
-        
-        return total_weeks
-    
-    def _estimate_value_increase(self, total_cost):
-        """Estimate property value increase from improvements"""
-        # Typical ROI for property improvements is 60-80% of investment
-        roi_multiplier = random.uniform(0.65, 0.85)
-        return int(total_cost * roi_multiplier)
-    
-    def _calculate_roi(self, investment, value_increase):
-        """Calculate ROI percentage"""
-        if investment > 0:
-            roi = (value_increase / investment) * 100
-            return round(roi, 1)
-        return 0
-    
-    def _calculate_payback_period(self, roi_percentage):
-        """Calculate payback period in years"""
-        if roi_percentage > 0:
-            # Assuming annual appreciation/rental increase
-            annual_return = max(3, roi_percentage / 5)  # Conservative estimate
-            payback = 100 / annual_return
-            return round(payback, 1)
-        return 0
-    
-    def _get_recommendation(self, severity):
-        """Get recommendation based on issue severity"""
-        recommendations = {
-            'high': 'Immediate attention required - schedule professional assessment',
-            'medium': 'Plan for repair within next 6 months',
-            'low': 'Monitor condition and include in regular maintenance schedule'
-        }
-        return recommendations.get(severity, 'Professional assessment recommended')
\ No newline at end of file
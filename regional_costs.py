@@ -0,0 +1,212 @@
+"""Regional labor and material cost multipliers.
+
+regional_costs.json (or the file named by REGIONAL_COSTS_PATH) maps ranges
+of three-digit ZIP prefixes to regions, each with a labor and a material
+multiplier relative to the national averages in the cost tables. Regions
+listed later override earlier ones, so metro areas are declared after the
+state that contains them.
+
+The file is compiled once into a 1000-entry list indexed by ZIP prefix, so
+locating a property is a regex match and a list index, with no network
+access. Only the city/state part at the end of an address is read: a ZIP
+counts when it ends the address, and a state code or name when it ends
+that part, so house numbers and street suffixes ("Oak CT", "St NE") are
+never taken for either. When the ZIP and the state disagree the state
+wins; addresses with neither get the national default.
+"""
+import os
+import re
+import json
+import threading
+from cost_tables import COST_CATEGORIES
+
+DEFAULT_PATH = os.environ.get('REGIONAL_COSTS_PATH') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'regional_costs.json')
+
+_ZIP_PATTERN = re.compile(r'(?:^|\s)(\d{5})(?:-\d{4})?$')
+_STATE_CODE_PATTERN = re.compile(r'[A-Z]{2}')
+_COUNTRY_PATTERN = re.compile(r'(?:U\.?S\.?A?\.?|United States(?: of America)?)', re.IGNORECASE)
+_WORD_PATTERN = re.compile(r'[A-Za-z]+')
+
+def _split_tail(address):
+    """The city/state part of an address and the ZIP that ends it.
+
+    Returns (place, zip_code, has_street): place is the last comma-separated
+    part with the ZIP and any country removed, and has_street says whether
+    other parts come before it.
+    """
+    parts = [part.strip() for part in (address or '').split(',') if part.strip()]
+    if len(parts) > 1 and _COUNTRY_PATTERN.fullmatch(parts[-1]):
+        parts.pop()
+    if not parts:
+        return '', '', False
+
+    zip_code = ''
+    match = _ZIP_PATTERN.search(parts[-1])
+    if match:
+        zip_code = match.group(1)
+        parts[-1] = parts[-1][:match.start()].strip()
+        # "Austin, TX, 78701": the state is in the part before the ZIP
+        if not parts[-1]:
+            parts.pop()
+    if not parts:
+        return '', zip_code, False
+    return parts[-1], zip_code, len(parts) > 1
+
+def extract_zip(address):
+    """ZIP code ending a free-text address, or ''.
+
+    The ZIP must follow a comma or a two-letter state code, so a house
+    number ("10250 Preston Rd") is never read as one.
+    """
+    place, zip_code, has_street = _split_tail(address)
+    if not zip_code:
+        return ''
+    words = place.split()
+    if has_street or (words and _STATE_CODE_PATTERN.fullmatch(words[-1])):
+        return zip_code
+    return ''
+
+class RegionalIndex:
+    """Compiled ZIP prefix and state lookup for one multiplier file"""
+
+    def __init__(self, config):
+        self.version = str(config['version'])
+        self.default = self._compile_region(None, config['default'])
+        self.labor_share = tuple(config['labor_share'][c] for c in COST_CATEGORIES)
+
+        self.regions = {}
+        self._by_zip3 = [None] * 1000
+        self._state_zip3 = {}
+        self._by_code = {}
+        self._by_name = {}
+
+        for key, region in config['regions'].items():
+            compiled = self._compile_region(key, region)
+            self.regions[key] = compiled
+            for start, end in region.get('zip3', []):
+                if not 0 <= start <= end <= 999:
+                    raise ValueError(f"Invalid ZIP prefix range in region '{key}'")
+                self._by_zip3[start:end + 1] = [compiled] * (end - start + 1)
+            # Only whole-state regions answer state lookups, never metros;
+            # a metro keyed like a state code would shadow that state
+            if re.fullmatch(r'[A-Z]{2}', key) and region.get('state') != key:
+                raise ValueError(f"Region '{key}' is keyed like a state code but is in {region.get('state')}")
+            if region.get('state') == key:
+                self._state_zip3[key] = {p for start, end in region.get('zip3', []) for p in range(start, end + 1)}
+                self._by_code[key.upper()] = compiled
+                self._by_name[region['name'].upper()] = compiled
+
+        self._longest_state_name = max((len(name.split()) for name in self._by_name), default=1)
+
+    def _compile_region(self, key, region):
+        labor, material = float(region['labor']), float(region['material'])
+        if labor <= 0 or material <= 0:
+            raise ValueError(f"Multipliers must be positive in region '{key}'")
+        return {
+            'key': key,
+            'name': region['name'],
+            'state': region.get('state'),
+            'labor': labor,
+            'material': material
+        }
+
+    def locate(self, address):
+        """Region for a free-text address, with how it was matched"""
+        zip_code = extract_zip(address)
+        place, _, has_street = _split_tail(address)
+        # Without a comma or a ZIP the state must be the whole address, so
+        # "12 Oak CT" alone is not Connecticut
+        state = self._match_state(place, whole=not (has_street or zip_code))
+
+        region = self._by_zip3[int(zip_code[:3])] if zip_code else None
+        if region is not None and (state is None or int(zip_code[:3]) in self._state_zip3[state['key']]):
+            return self._describe(region, 'zip', zip_code)
+
+        # A ZIP from another state is more likely a typo than the state
+        if state is not None:
+            return self._describe(state, 'state', zip_code)
+
+        return self._describe(self.default, 'default', zip_code)
+
+    def _match_state(self, place, whole=False):
+        # The state ends the city/state part: a code in capitals (so "in"
+        # or "me" never match) or a name, multi-word names first. With
+        # whole set it must be all of place.
+        words = _WORD_PATTERN.findall(place)
+        if not words:
+            return None
+        if not whole or len(words) == 1:
+            region = self._by_code.get(words[-1])
+            if region is not None:
+                return region
+        lengths = [len(words)] if whole else range(min(self._longest_state_name, len(words)), 0, -1)
+        for length in lengths:
+            region = self._by_name.get(' '.join(words[-length:]).upper())
+            if region is not None:
+                return region
+        return None
+
+    def _describe(self, region, source, zip_code):
+        multipliers = {
+            category: round(share * region['labor'] + (1 - share) * region['material'], 4)
+            for category, share in zip(COST_CATEGORIES, self.labor_share)
+        }
+        return {
+            'region': region['key'],
+            'name': region['name'],
+            'state': region['state'],
+            'zip': zip_code,
+            'source': source,
+            'labor_multiplier': region['labor'],
+            'material_multiplier': region['material'],
+            'category_multipliers': multipliers,
+            'version': self.version
+        }
+
+def load_regional_index(path=DEFAULT_PATH):
+    """Read and compile a regional multiplier file"""
+    with open(path, 'r') as f:
+        return RegionalIndex(json.load(f))
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    """The regional index, compiled on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_regional_index()
+    return _index
+
+def locate(address):
+    """Region for an address, or None if the multiplier file cannot be loaded"""
+    try:
+        return get_index().locate(address)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Error loading regional costs {DEFAULT_PATH}: {e}")
+        return None
+
+def adjust_issues(issues, region):
+    """Scale each issue's cost by its category's regional multiplier.
+
+    Issues are updated in place with new cost_range dicts, so templates
+    shared through the cost table are never modified.
+    """
+    if not region or region['source'] == 'default':
+        return issues
+    multipliers = region['category_multipliers']
+    for issue in issues:
+        factor = multipliers.get(issue['category'], 1.0)
+        if factor == 1.0:
+            continue
+        issue['estimated_cost'] = int(round(issue['estimated_cost'] * factor))
+        cost_range = issue.get('cost_range')
+        if cost_range:
+            issue['cost_range'] = {
+                'min': int(round(cost_range['min'] * factor)),
+                'max': int(round(cost_range['max'] * factor))
+            }
+    return issues
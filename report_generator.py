@@ -1,19 +1,145 @@
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.pdfgen import canvas
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.graphics.shapes import Drawing, Rect
 from reportlab.graphics.charts.piecharts import Pie
 from reportlab.graphics.charts.barcharts import VerticalBarChart
 from reportlab.graphics import renderPDF
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import io
 import os
+import threading
+import analysis_rules as rules
+import report_model
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # Without pypdf every report is built in a single pass
+    PdfReader = PdfWriter = None
+
+# Reports with fewer issues than this are cheaper to build in one pass than
+# to ship to the process pool and merge
+PARALLEL_MIN_ISSUES = int(os.environ.get('REPORT_PARALLEL_MIN_ISSUES', '150'))
+REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', '0')) or min(len(report_model.SECTION_BUILDERS), os.cpu_count() or 1)
+
+# Issue tables are emitted as blocks of at most this many rows, each short
+# enough to fit on a page, so ReportLab never has to split one giant table
+ISSUE_TABLE_ROWS = 30
+
+# Flowables buffered ahead of the layout engine while streaming a story
+STORY_WINDOW = 64
+
+TOTAL_PAGES_FORM = 'reportTotalPages'
+FOOTER_COLOR = colors.HexColor('#888888')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    """Process pool for section rendering, started on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=REPORT_WORKERS)
+    return _pool
+
+def shutdown_pool():
+    """Stop the section rendering processes, if any were started"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+def _new_document(target):
+    return SimpleDocTemplate(
+        target,
+        pagesize=A4,
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=72
+    )
+
+def _draw_page_number(pdf_canvas, page, total=None):
+    """Footer "Page N of M"; without a total, M is the form drawn by _TotalPages"""
+    pdf_canvas.saveState()
+    pdf_canvas.setFont('Helvetica', 8)
+    pdf_canvas.setFillColor(FOOTER_COLOR)
+    pdf_canvas.drawRightString(A4[0] / 2, 0.5 * inch, f"Page {page} of ")
+    if total is not None:
+        pdf_canvas.drawString(A4[0] / 2, 0.5 * inch, str(total))
+    else:
+        pdf_canvas.translate(A4[0] / 2, 0.5 * inch)
+        pdf_canvas.doForm(TOTAL_PAGES_FORM)
+    pdf_canvas.restoreState()
+
+def _draw_page_footer(pdf_canvas, doc):
+    _draw_page_number(pdf_canvas, doc.page)
+
+class _TotalPages(Flowable):
+    """Zero-size last flowable that draws the page count every footer refers to.
+
+    Pages are written as they are laid out, so the total is not known when
+    each footer is drawn; the footers reference a form that is only defined
+    here, once the last page has been reached.
+    """
+
+    def wrap(self, available_width, available_height):
+        return 0, 0
+
+    def draw(self):
+        pdf_canvas = self.canv
+        pdf_canvas.beginForm(TOTAL_PAGES_FORM)
+        pdf_canvas.setFont('Helvetica', 8)
+        pdf_canvas.setFillColor(FOOTER_COLOR)
+        pdf_canvas.drawString(0, 0, str(pdf_canvas.getPageNumber()))
+        pdf_canvas.endForm()
+
+class _StreamingStory(list):
+    """Story that pulls flowables from an iterator as the document consumes them.
+
+    BaseDocTemplate.build only checks the story's length and takes from its
+    front, so topping the list up in __len__ keeps a window of flowables in
+    memory instead of the whole report.
+    """
+
+    def __init__(self, flowables):
+        super().__init__()
+        self._source = iter(flowables)
+
+    def __len__(self):
+        if self._source is not None and list.__len__(self) < STORY_WINDOW:
+            for flowable in self._source:
+                self.append(flowable)
+                if list.__len__(self) >= STORY_WINDOW:
+                    break
+            else:
+                self._source = None
+        return list.__len__(self)
+
+_worker_generator = None
+
+def _render_section(index, results):
+    """Render one section to PDF bytes; runs in a pool worker"""
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = ReportGenerator()
+    buffer = io.BytesIO()
+    section = report_model.build_section(index, results)
+    _new_document(buffer).build(_StreamingStory(_worker_generator.iter_flowables(section)))
+    return buffer.getvalue()
 
 class ReportGenerator:
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
+        self._setup_table_styles()
     
     def _setup_custom_styles(self):
         """Setup custom paragraph styles"""
@@ -66,414 +192,210 @@ class ReportGenerator:
             leftIndent=20,
             textColor=colors.HexColor('#444444')
         )
-    
-    def generate_report(self, analysis_results, session_id):
-        """Generate a comprehensive PDF report"""
-        report_filename = f'reports/property_analysis_{session_id}.pdf'
-        
-        # Ensure reports directory exists
-        os.makedirs('reports', exist_ok=True)
-        
-        # Create the PDF document
-        doc = SimpleDocTemplate(
-            report_filename,
-            pagesize=A4,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=72
-        )
-        
-        # Build the story (content)
-        story = []
-        
-        # Title Page
-        story.extend(self._create_title_page(analysis_results))
-        story.append(PageBreak())
-        
-        # Executive Summary
-        story.extend(self._create_executive_summary(analysis_results))
-        story.append(PageBreak())
-        
-        # Detailed Analysis
-        story.extend(self._create_detailed_analysis(analysis_results))
-        story.append(PageBreak())
-        
-        # Cost Breakdown
-        story.extend(self._create_cost_breakdown(analysis_results))
-        story.append(PageBreak())
-        
-        # Investment Analysis
-        story.extend(self._create_investment_analysis(analysis_results))
-        story.append(PageBreak())
-        
-        # Recommendations
-        story.extend(self._create_recommendations(analysis_results))
-        
-        # Build the PDF
-        doc.build(story)
-        
-        return report_filename
-    
-    def _create_title_page(self, results):
-        """Create the title page"""
-        story = []
-        
-        # Main title
-        story.append(Paragraph("Andrew and Kelli Contractors", self.title_style))
-        story.append(Paragraph("Drone Photo Analysis Report", self.title_style))
-        story.append(Spacer(1, 50))
-        
-        # Property information
-        property_address = results.get('property_address', 'Property Analysis')
-        story.append(Paragraph(f"<b>Property:</b> {property_address}", self.header_style))
-        story.append(Spacer(1, 20))
-        
-        # Report details
-        report_date = datetime.now().strftime("%B %d, %Y")
-        story.append(Paragraph(f"<b>Report Date:</b> {report_date}", self.body_style))
-        story.append(Paragraph(f"<b>Images Analyzed:</b> {results['images_analyzed']}", self.body_style))
-        story.append(Paragraph(f"<b>Session ID:</b> {results['session_id']}", self.body_style))
-        story.append(Spacer(1, 30))
-        
-        # Key metrics summary table
-        summary_data = [
-            ['Metric', 'Value'],
-            ['Total Estimated Cost', f"${results['total_estimated_cost']:,.0f}"],
-            ['Issues Identified', f"{len(results['issues_found'])}"],
-            ['Property Condition Score', f"{results['overall_condition_score']}/10"],
-            ['Estimated Timeline', f"{results['estimated_timeline_weeks']} weeks"],
-            ['Potential Value Increase', f"${results['potential_value_increase']:,.0f}"],
-            ['Estimated ROI', f"{results['roi_percentage']}%"]
-        ]
-        
-        summary_table = Table(summary_data, colWidths=[2.5*inch, 2*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#007bff')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10)
-        ]))
-        
-        story.append(summary_table)
-        story.append(Spacer(1, 50))
-        
-        # Disclaimer
-        disclaimer = """
-        <b>DISCLAIMER:</b> This report is generated using AI-powered image analysis and provides estimates 
-        based on visual assessment of drone photographs. Actual costs may vary significantly based on local 
-        market conditions, material choices, and detailed on-site inspections. This report is intended for 
-        initial assessment purposes only and should be supplemented with professional inspections and contractor 
-        quotes for accurate cost estimates.
-        """
-        story.append(Paragraph(disclaimer, self.body_style))
-        
-        return story
-    
-    def _create_executive_summary(self, results):
-        """Create executive summary section"""
-        story = []
         
-        story.append(Paragraph("Executive Summary", self.header_style))
-        story.append(Spacer(1, 12))
-        
-        # Overall assessment
-        condition_assessment = self._get_condition_assessment(results['overall_condition_score'])
-        summary_text = f"""
-        <b>Property Condition:</b> {condition_assessment}<br/><br/>
-        
-        Our AI-powered analysis of {results['images_analyzed']} drone photographs has identified 
-        {len(results['issues_found'])} potential areas requiring attention. The estimated total 
-        cost for addressing all identified issues is <b>${results['total_estimated_cost']:,.0f}</b>.
-        <br/><br/>
-        
-        The analysis indicates a potential property value increase of 
-        <b>${results['potential_value_increase']:,.0f}</b> upon completion of recommended improvements, 
-        representing an estimated ROI of <b>{results['roi_percentage']}%</b>.
-        <br/><br/>
-        
-        <b>Timeline:</b> The estimated completion timeline for all improvements is 
-        {results['estimated_timeline_weeks']} weeks, depending on contractor availability and weather conditions.
-        """
-        
-        story.append(Paragraph(summary_text, self.body_style))
-        story.append(Spacer(1, 20))
-        
-        # Priority issues
-        high_priority_issues = [issue for issue in results['issues_found'] if issue['severity'] == 'high']
-        if high_priority_issues:
-            story.append(Paragraph("High Priority Issues", self.subheader_style))
-            for issue in high_priority_issues:
-                issue_text = f"• {issue['description']} (Est. Cost: ${issue['estimated_cost']:,.0f})"
-                story.append(Paragraph(issue_text, self.issue_style))
-            story.append(Spacer(1, 12))
+        # Investment recommendation styles, one per verdict colour
+        self.recommendation_styles = {
+            color: ParagraphStyle(
+                f'RecommendationStyle{color}',
+                parent=self.body_style,
+                fontSize=14,
+                textColor=colors.HexColor(color),
+                alignment=1,
+                spaceAfter=10
+            )
+            for color in report_model.VERDICT_COLORS.values()
+        }
         
-        return story
+        self.heading_styles = {
+            'title': self.title_style,
+            'header': self.header_style,
+            'subheader': self.subheader_style
+        }
+        self.paragraph_styles = {
+            'body': self.body_style,
+            'issue': self.issue_style
+        }
     
-    def _create_detailed_analysis(self, results):
-        """Create detailed analysis section"""
-        story = []
-        
-        story.append(Paragraph("Detailed Analysis", self.header_style))
-        story.append(Spacer(1, 12))
-        
-        # Analysis by category
-        categories = {
-            'roof': 'Roof Condition',
-            'siding': 'Exterior Siding',
-            'landscaping': 'Landscaping',
-            'hardscaping': 'Hardscaping'
+    def _setup_table_styles(self):
+        """Build the table styles once; every table of a kind shares one"""
+        self.table_styles = {
+            'summary': TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#007bff')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 12),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 1), (-1, -1), 10)
+            ]),
+            'issues': TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#007bff')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('FONTSIZE', (0, 1), (-1, -1), 9),
+                ('ALIGN', (2, 1), (3, -1), 'CENTER')
+            ]),
+            'issues_continued': TableStyle([
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('BACKGROUND', (0, 0), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('ALIGN', (2, 0), (3, -1), 'CENTER')
+            ]),
+            'cost': TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#007bff')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 12),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
+                ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#f0f0f0')),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 1), (-1, -1), 10),
+                ('ALIGN', (1, 1), (2, -1), 'CENTER')
+            ]),
+            'investment': TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#28a745')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 11),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 1), (-1, -1), 9),
+                ('ALIGN', (1, 1), (1, -1), 'CENTER')
+            ])
         }
-        
-        for category, title in categories.items():
-            issues = results['issues_by_category'].get(category, [])
-            if issues:
-                story.append(Paragraph(title, self.subheader_style))
-                
-                # Create table for issues in this category
-                table_data = [['Issue Description', 'Severity', 'Estimated Cost', 'Confidence']]
-                
-                for issue in issues:
-                    severity_color = self._get_severity_color(issue['severity'])
-                    table_data.append([
-                        issue['description'],
-                        issue['severity'].title(),
-                        f"${issue['estimated_cost']:,.0f}",
-                        f"{int(issue['confidence'] * 100)}%"
-                    ])
-                
-                issue_table = Table(table_data, colWidths=[3*inch, 0.8*inch, 1*inch, 0.8*inch])
-                issue_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#007bff')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('FONTSIZE', (0, 1), (-1, -1), 9),
-                    ('ALIGN', (2, 1), (3, -1), 'CENTER')
-                ]))
-                
-                story.append(issue_table)
-                story.append(Spacer(1, 15))
-                
-                # Add recommendations for this category
-                story.append(Paragraph(f"<b>{title} Recommendations:</b>", self.body_style))
-                for issue in issues:
-                    if issue.get('recommendation'):
-                        rec_text = f"• {issue['recommendation']}"
-                        story.append(Paragraph(rec_text, self.issue_style))
-                story.append(Spacer(1, 20))
-        
-        return story
     
-    def _create_cost_breakdown(self, results):
-        """Create cost breakdown section"""
-        story = []
-        
-        story.append(Paragraph("Cost Breakdown", self.header_style))
-        story.append(Spacer(1, 12))
-        
-        # Cost breakdown table
-        cost_data = [['Category', 'Estimated Cost', 'Percentage of Total']]
-        total_cost = results['total_estimated_cost']
-        
-        for category, cost in results['cost_breakdown'].items():
-            if cost > 0:
-                percentage = (cost / total_cost) * 100 if total_cost > 0 else 0
-                cost_data.append([
-                    category.title().replace('_', ' '),
-                    f"${cost:,.0f}",
-                    f"{percentage:.1f}%"
-                ])
-        
-        # Add total row
-        cost_data.append(['TOTAL', f"${total_cost:,.0f}", '100.0%'])
+    def generate_report(self, analysis_results, session_id, results_mtime=None, report_filename=None):
+        """Generate a comprehensive PDF report.
         
-        cost_table = Table(cost_data, colWidths=[2*inch, 1.5*inch, 1.5*inch])
-        cost_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#007bff')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#f0f0f0')),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('ALIGN', (1, 1), (2, -1), 'CENTER')
-        ]))
-        
-        story.append(cost_table)
-        story.append(Spacer(1, 20))
-        
-        # Cost estimation notes
-        notes = """
-        <b>Cost Estimation Notes:</b><br/>
-        • Costs are estimated based on national averages and may vary by location<br/>
-        • Labor costs can vary significantly based on local market conditions<br/>
-        • Material costs are subject to market fluctuations<br/>
-        • Some improvements may qualify for tax credits or rebates<br/>
-        • Professional quotes are recommended for accurate pricing
+        When results_mtime is given, a PDF already rendered from results at
+        least that new is returned as-is instead of being rebuilt. The PDF
+        goes to reports/ unless report_filename says otherwise.
         """
-        story.append(Paragraph(notes, self.body_style))
-        
-        return story
-    
-    def _create_investment_analysis(self, results):
-        """Create investment analysis section"""
-        story = []
-        
-        story.append(Paragraph("Investment Analysis", self.header_style))
-        story.append(Spacer(1, 12))
+        if report_filename is None:
+            report_filename = f'reports/property_analysis_{session_id}.pdf'
+        
+        if results_mtime is not None:
+            try:
+                if os.path.getmtime(report_filename) >= results_mtime:
+                    return report_filename
+            except OSError:
+                pass
+        
+        # Sections read counts and per-severity issue lists from the session
+        # summary; results saved without one get it computed here once
+        if 'summary' not in analysis_results:
+            analysis_results = dict(analysis_results,
+                                    summary=rules.build_rollup(analysis_results['issues_found']))
         
-        # Investment metrics table
-        investment_data = [
-            ['Metric', 'Value', 'Notes'],
-            ['Total Investment', f"${results['total_estimated_cost']:,.0f}", 'Cost of all improvements'],
-            ['Potential Value Increase', f"${results['potential_value_increase']:,.0f}", 'Estimated property value gain'],
-            ['Return on Investment', f"{results['roi_percentage']}%", 'Based on value increase'],
-            ['Payback Period', f"{results['payback_years']} years", 'Time to recover investment'],
-            ['Property Condition Score', f"{results['overall_condition_score']}/10", 'Current condition rating']
-        ]
-        
-        investment_table = Table(investment_data, colWidths=[1.8*inch, 1.5*inch, 2.2*inch])
-        investment_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#28a745')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ALIGN', (1, 1), (1, -1), 'CENTER')
-        ]))
+        # Ensure reports directory exists
+        os.makedirs(os.path.dirname(report_filename) or '.', exist_ok=True)
         
-        story.append(investment_table)
-        story.append(Spacer(1, 20))
+        # Large reports render each section in its own process and merge the
+        # fragments; anything else, or a failed pool, builds in one pass
+        if (PdfWriter is not None and REPORT_WORKERS > 1
+                and analysis_results['summary']['issue_count'] >= PARALLEL_MIN_ISSUES):
+            try:
+                self._build_parallel(analysis_results, report_filename)
+                return report_filename
+            except BrokenProcessPool as e:
+                print(f"Error rendering report sections in parallel, building in one pass: {e}")
         
-        # Investment recommendation
-        roi = results['roi_percentage']
-        if roi > 20:
-            recommendation = "EXCELLENT INVESTMENT OPPORTUNITY"
-            color = colors.HexColor('#28a745')
-        elif roi > 10:
-            recommendation = "GOOD INVESTMENT POTENTIAL"
-            color = colors.HexColor('#ffc107')
-        else:
-            recommendation = "CONSIDER CAREFULLY"
-            color = colors.HexColor('#dc3545')
+        self._build_sequential(analysis_results, report_filename)
         
-        rec_style = ParagraphStyle(
-            'RecommendationStyle',
-            parent=self.body_style,
-            fontSize=14,
-            textColor=color,
-            alignment=1,
-            spaceAfter=10
+        return report_filename
+    
+    def _build_sequential(self, results, report_filename):
+        """Stream every section through one document"""
+        _new_document(report_filename).build(
+            _StreamingStory(self._iter_story(results)),
+            onFirstPage=_draw_page_footer,
+            onLaterPages=_draw_page_footer
         )
-        
-        story.append(Paragraph(f"<b>{recommendation}</b>", rec_style))
-        
-        # Detailed analysis
-        analysis_text = f"""
-        Based on the analysis, this property shows {"strong" if roi > 15 else "moderate" if roi > 8 else "limited"} 
-        investment potential. The estimated improvements could increase the property value by 
-        ${results['potential_value_increase']:,.0f}, representing a {roi}% return on the 
-        ${results['total_estimated_cost']:,.0f} investment.
-        """
-        story.append(Paragraph(analysis_text, self.body_style))
-        
-        return story
     
-    def _create_recommendations(self, results):
-        """Create recommendations section"""
-        story = []
-        
-        story.append(Paragraph("Recommendations", self.header_style))
-        story.append(Spacer(1, 12))
-        
-        # Priority-based recommendations
-        high_issues = [i for i in results['issues_found'] if i['severity'] == 'high']
-        medium_issues = [i for i in results['issues_found'] if i['severity'] == 'medium']
-        low_issues = [i for i in results['issues_found'] if i['severity'] == 'low']
-        
-        if high_issues:
-            story.append(Paragraph("Immediate Action Required (High Priority)", self.subheader_style))
-            for issue in high_issues:
-                text = f"• {issue['description']} - Est. Cost: ${issue['estimated_cost']:,.0f}"
-                story.append(Paragraph(text, self.issue_style))
-            story.append(Spacer(1, 12))
-        
-        if medium_issues:
-            story.append(Paragraph("Plan Within 6 Months (Medium Priority)", self.subheader_style))
-            for issue in medium_issues:
-                text = f"• {issue['description']} - Est. Cost: ${issue['estimated_cost']:,.0f}"
-                story.append(Paragraph(text, self.issue_style))
-            story.append(Spacer(1, 12))
-        
-        if low_issues:
-            story.append(Paragraph("Regular Maintenance (Low Priority)", self.subheader_style))
-            for issue in low_issues:
-                text = f"• {issue['description']} - Est. Cost: ${issue['estimated_cost']:,.0f}"
-                story.append(Paragraph(text, self.issue_style))
-            story.append(Spacer(1, 12))
-        
-        # General recommendations
-        general_recs = """
-        <b>General Recommendations:</b><br/><br/>
-        
-        1. <b>Professional Inspections:</b> Schedule detailed inspections for high-priority items<br/>
-        2. <b>Multiple Quotes:</b> Obtain quotes from multiple licensed contractors<br/>
-        3. <b>Permits:</b> Verify permit requirements for major improvements<br/>
-        4. <b>Insurance:</b> Check if improvements affect insurance coverage<br/>
-        5. <b>Market Analysis:</b> Research local market conditions before major investments<br/>
-        6. <b>Phased Approach:</b> Consider completing work in phases to spread costs<br/>
-        7. <b>Energy Efficiency:</b> Explore energy-efficient options that may qualify for rebates
-        """
-        
-        story.append(Paragraph(general_recs, self.body_style))
-        story.append(Spacer(1, 20))
-        
-        # Footer
-        footer_text = """
-        <b>Andrew and Kelli Contractors</b> - This report was generated using AI-powered drone photo analysis. 
-        For questions about this report or to schedule additional analysis, please contact your 
-        real estate professional.
-        """
-        story.append(Paragraph(footer_text, self.body_style))
-        
-        return story
+    def _iter_story(self, results):
+        """Flowables of the whole report, one section built at a time"""
+        for index, section in enumerate(report_model.iter_sections(results)):
+            if index:
+                yield PageBreak()
+            yield from self.iter_flowables(section)
+        yield _TotalPages()
     
-    def _get_condition_assessment(self, score):
-        """Get condition assessment based on score"""
-        if score >= 8:
-            return "Excellent Condition"
-        elif score >= 6:
-            return "Good Condition"
-        elif score >= 4:
-            return "Fair Condition - Some Issues Identified"
-        else:
-            return "Poor Condition - Significant Issues Identified"
+    def _build_parallel(self, results, report_filename):
+        """Render sections as separate PDFs in the pool and concatenate them"""
+        count = len(report_model.SECTION_BUILDERS)
+        fragments = _get_pool().map(_render_section, range(count), [results] * count)
+        
+        writer = PdfWriter()
+        for fragment in fragments:
+            for page in PdfReader(io.BytesIO(fragment)).pages:
+                writer.add_page(page)
+        
+        # Page numbers are stamped after the merge, once the total is known
+        total = len(writer.pages)
+        stamp_buffer = io.BytesIO()
+        stamp_canvas = canvas.Canvas(stamp_buffer, pagesize=A4)
+        for page_number in range(1, total + 1):
+            _draw_page_number(stamp_canvas, page_number, total)
+            stamp_canvas.showPage()
+        stamp_canvas.save()
+        
+        for page, stamp in zip(writer.pages, PdfReader(stamp_buffer).pages):
+            page.merge_page(stamp)
+        
+        with open(report_filename, 'wb') as f:
+            writer.write(f)
     
-    def _get_severity_color(self, severity):
-        """Get color based on severity"""
-        colors_map = {
-            'high': colors.red,
-            'medium': colors.orange,
-            'low': colors.green
-        }
-        return colors_map.get(severity, colors.black)
\ No newline at end of file
+    def iter_flowables(self, section):
+        """Flowables for one section of the report model, generated lazily"""
+        for block in section['blocks']:
+            kind = block['type']
+            if kind == 'heading':
+                yield Paragraph(block['text'], self.heading_styles[block['level']])
+            elif kind == 'paragraph':
+                if block['style'] == 'verdict':
+                    style = self.recommendation_styles[block['color']]
+                else:
+                    style = self.paragraph_styles[block['style']]
+                yield Paragraph(block['text'], style)
+            elif kind == 'bullets':
+                style = self.paragraph_styles[block['style']]
+                for item in block['items']:
+                    yield Paragraph(f"• {item}", style)
+            elif kind == 'table':
+                yield from self._table_flowables(block)
+            elif kind == 'spacer':
+                yield Spacer(1, block['height'])
+    
+    def _table_flowables(self, block):
+        """A table, cut into page-sized blocks when it is an issue table"""
+        widths = [width * inch for width in block['widths']]
+        rows = block['rows']
+        if block['kind'] != 'issues' or len(rows) <= ISSUE_TABLE_ROWS + 1:
+            yield Table(rows, colWidths=widths, repeatRows=1, style=self.table_styles[block['kind']])
+            return
+        
+        # The first block carries the header; the rest continue the grid
+        # directly below it
+        header, body = rows[0], rows[1:]
+        for start in range(0, len(body), ISSUE_TABLE_ROWS):
+            chunk = body[start:start + ISSUE_TABLE_ROWS]
+            if start == 0:
+                yield Table([header] + chunk, colWidths=widths, repeatRows=1,
+                            style=self.table_styles['issues'])
+            else:
+                yield Table(chunk, colWidths=widths, style=self.table_styles['issues_continued'])
@@ -0,0 +1,336 @@
+"""Format-neutral report content.
+
+Each section builder turns a session's analysis results into a section
+dict: an id, a title and a list of blocks. Block types are heading,
+paragraph, bullets, table and spacer. Paragraph and bullet text uses the
+small markup subset (<b>, <br/>) that both ReportLab and HTML understand,
+with every value from the results escaped. report_generator renders
+sections to PDF; report.html and the JSON report endpoint render the same
+sections, so the three formats never drift apart.
+
+Stdlib only, so the slim deployment can serve HTML and JSON reports
+without ReportLab.
+"""
+from datetime import datetime
+from html import escape
+import analysis_rules as rules
+
+MODEL_VERSION = 1
+
+DETAIL_CATEGORIES = {
+    'roof': 'Roof Condition',
+    'siding': 'Exterior Siding',
+    'landscaping': 'Landscaping',
+    'hardscaping': 'Hardscaping'
+}
+
+VERDICT_COLORS = {'excellent': '#28a745', 'good': '#ffc107', 'caution': '#dc3545'}
+
+def heading(text, level='header'):
+    return {'type': 'heading', 'level': level, 'text': text}
+
+def paragraph(text, style='body', color=None):
+    block = {'type': 'paragraph', 'style': style, 'text': text}
+    if color:
+        block['color'] = color
+    return block
+
+def bullets(items, style='issue'):
+    return {'type': 'bullets', 'style': style, 'items': items}
+
+def table(kind, rows, widths):
+    """A table whose first row is the header; widths are in inches"""
+    return {'type': 'table', 'kind': kind, 'rows': rows, 'widths': widths}
+
+def spacer(height):
+    return {'type': 'spacer', 'height': height}
+
+def _section(section_id, title, blocks):
+    return {'id': section_id, 'title': title, 'blocks': blocks}
+
+def _money(value):
+    return f"${value:,.0f}"
+
+def _ensure_summary(results):
+    if 'summary' not in results:
+        results = dict(results, summary=rules.build_rollup(results['issues_found']))
+    return results
+
+def _issues_with_severity(results, severity):
+    """Issues of one severity, looked up through the summary index"""
+    issues = results['issues_found']
+    return [issues[i] for i in results['summary']['severity_index'].get(severity, [])]
+
+def condition_assessment(score):
+    """Condition assessment based on score"""
+    if score >= 8:
+        return "Excellent Condition"
+    elif score >= 6:
+        return "Good Condition"
+    elif score >= 4:
+        return "Fair Condition - Some Issues Identified"
+    else:
+        return "Poor Condition - Significant Issues Identified"
+
+def title_section(results):
+    """Title page: property details and key metrics"""
+    property_address = escape(str(results.get('property_address', 'Property Analysis')))
+    report_date = datetime.now().strftime("%B %d, %Y")
+
+    summary_rows = [
+        ['Metric', 'Value'],
+        ['Total Estimated Cost', _money(results['total_estimated_cost'])],
+        ['Issues Identified', f"{results['summary']['issue_count']}"],
+        ['Property Condition Score', f"{results['overall_condition_score']}/10"],
+        ['Estimated Timeline', f"{results['estimated_timeline_weeks']} weeks"],
+        ['Potential Value Increase', _money(results['potential_value_increase'])],
+        ['Estimated ROI', f"{results['roi_percentage']}%"]
+    ]
+
+    disclaimer = """
+    <b>DISCLAIMER:</b> This report is generated using AI-powered image analysis and provides estimates
+    based on visual assessment of drone photographs. Actual costs may vary significantly based on local
+    market conditions, material choices, and detailed on-site inspections. This report is intended for
+    initial assessment purposes only and should be supplemented with professional inspections and contractor
+    quotes for accurate cost estimates.
+    """
+
+    return _section('title', 'Drone Photo Analysis Report', [
+        heading("Andrew and Kelli Contractors", 'title'),
+        heading("Drone Photo Analysis Report", 'title'),
+        spacer(50),
+        heading(f"<b>Property:</b> {property_address}"),
+        spacer(20),
+        paragraph(f"<b>Report Date:</b> {report_date}"),
+        paragraph(f"<b>Images Analyzed:</b> {results['images_analyzed']}"),
+        paragraph(f"<b>Session ID:</b> {escape(str(results['session_id']))}"),
+        spacer(30),
+        table('summary', summary_rows, [2.5, 2]),
+        spacer(50),
+        paragraph(disclaimer)
+    ])
+
+def executive_summary_section(results):
+    """Executive summary and high priority issues"""
+    summary_text = f"""
+    <b>Property Condition:</b> {condition_assessment(results['overall_condition_score'])}<br/><br/>
+
+    Our AI-powered analysis of {results['images_analyzed']} drone photographs has identified
+    {results['summary']['issue_count']} potential areas requiring attention. The estimated total
+    cost for addressing all identified issues is <b>{_money(results['total_estimated_cost'])}</b>.
+    <br/><br/>
+
+    The analysis indicates a potential property value increase of
+    <b>{_money(results['potential_value_increase'])}</b> upon completion of recommended improvements,
+    representing an estimated ROI of <b>{results['roi_percentage']}%</b>.
+    <br/><br/>
+
+    <b>Timeline:</b> The estimated completion timeline for all improvements is
+    {results['estimated_timeline_weeks']} weeks, depending on contractor availability and weather conditions.
+    """
+
+    blocks = [
+        heading("Executive Summary"),
+        spacer(12),
+        paragraph(summary_text),
+        spacer(20)
+    ]
+
+    high_priority_issues = _issues_with_severity(results, 'high')
+    if high_priority_issues:
+        blocks.append(heading("High Priority Issues", 'subheader'))
+        blocks.append(bullets([
+            f"{escape(issue['description'])} (Est. Cost: {_money(issue['estimated_cost'])})"
+            for issue in high_priority_issues
+        ]))
+        blocks.append(spacer(12))
+
+    return _section('executive_summary', 'Executive Summary', blocks)
+
+def detailed_analysis_section(results):
+    """Per-category issue tables and recommendations"""
+    blocks = [
+        heading("Detailed Analysis"),
+        spacer(12)
+    ]
+
+    for category, title in DETAIL_CATEGORIES.items():
+        issues = results['issues_by_category'].get(category, [])
+        if not issues:
+            continue
+
+        blocks.append(heading(title, 'subheader'))
+
+        rows = [['Issue Description', 'Severity', 'Estimated Cost', 'Confidence']]
+        for issue in issues:
+            rows.append([
+                issue['description'],
+                issue['severity'].title(),
+                _money(issue['estimated_cost']),
+                f"{int(issue['confidence'] * 100)}%"
+            ])
+        blocks.append(table('issues', rows, [3, 0.8, 1, 0.8]))
+        blocks.append(spacer(15))
+
+        blocks.append(paragraph(f"<b>{title} Recommendations:</b>"))
+        blocks.append(bullets([escape(issue['recommendation'])
+                               for issue in issues if issue.get('recommendation')]))
+        blocks.append(spacer(20))
+
+    return _section('detailed_analysis', 'Detailed Analysis', blocks)
+
+def cost_breakdown_section(results):
+    """Cost per category and estimation notes"""
+    rows = [['Category', 'Estimated Cost', 'Percentage of Total']]
+    total_cost = results['total_estimated_cost']
+
+    for category, cost in results['cost_breakdown'].items():
+        if cost > 0:
+            percentage = (cost / total_cost) * 100 if total_cost > 0 else 0
+            rows.append([
+                category.title().replace('_', ' '),
+                _money(cost),
+                f"{percentage:.1f}%"
+            ])
+
+    rows.append(['TOTAL', _money(total_cost), '100.0%'])
+
+    region = results.get('region')
+    if region and region['source'] != 'default':
+        location_note = (f"Costs are adjusted for {escape(region['name'])} "
+                         f"(labor x{region['labor_multiplier']:.2f}, "
+                         f"materials x{region['material_multiplier']:.2f} of national averages)")
+    else:
+        location_note = "Costs are estimated based on national averages and may vary by location"
+
+    notes = f"""
+    <b>Cost Estimation Notes:</b><br/>
+    • {location_note}<br/>
+    • Labor costs can vary significantly based on local market conditions<br/>
+    • Material costs are subject to market fluctuations<br/>
+    • Some improvements may qualify for tax credits or rebates<br/>
+    • Professional quotes are recommended for accurate pricing
+    """
+
+    return _section('cost_breakdown', 'Cost Breakdown', [
+        heading("Cost Breakdown"),
+        spacer(12),
+        table('cost', rows, [2, 1.5, 1.5]),
+        spacer(20),
+        paragraph(notes)
+    ])
+
+def investment_analysis_section(results):
+    """Investment metrics and verdict"""
+    rows = [
+        ['Metric', 'Value', 'Notes'],
+        ['Total Investment', _money(results['total_estimated_cost']), 'Cost of all improvements'],
+        ['Potential Value Increase', _money(results['potential_value_increase']), 'Estimated property value gain'],
+        ['Return on Investment', f"{results['roi_percentage']}%", 'Based on value increase'],
+        ['Payback Period', f"{results['payback_years']} years", 'Time to recover investment'],
+        ['Property Condition Score', f"{results['overall_condition_score']}/10", 'Current condition rating']
+    ]
+
+    roi = results['roi_percentage']
+    if roi > 20:
+        recommendation, color = "EXCELLENT INVESTMENT OPPORTUNITY", VERDICT_COLORS['excellent']
+    elif roi > 10:
+        recommendation, color = "GOOD INVESTMENT POTENTIAL", VERDICT_COLORS['good']
+    else:
+        recommendation, color = "CONSIDER CAREFULLY", VERDICT_COLORS['caution']
+
+    analysis_text = f"""
+    Based on the analysis, this property shows {"strong" if roi > 15 else "moderate" if roi > 8 else "limited"}
+    investment potential. The estimated improvements could increase the property value by
+    {_money(results['potential_value_increase'])}, representing a {roi}% return on the
+    {_money(results['total_estimated_cost'])} investment.
+    """
+
+    return _section('investment_analysis', 'Investment Analysis', [
+        heading("Investment Analysis"),
+        spacer(12),
+        table('investment', rows, [1.8, 1.5, 2.2]),
+        spacer(20),
+        paragraph(f"<b>{recommendation}</b>", 'verdict', color),
+        paragraph(analysis_text)
+    ])
+
+def recommendations_section(results):
+    """Priority-ordered action items and general advice"""
+    blocks = [
+        heading("Recommendations"),
+        spacer(12)
+    ]
+
+    priorities = [
+        ('high', "Immediate Action Required (High Priority)"),
+        ('medium', "Plan Within 6 Months (Medium Priority)"),
+        ('low', "Regular Maintenance (Low Priority)")
+    ]
+    for severity, title in priorities:
+        issues = _issues_with_severity(results, severity)
+        if issues:
+            blocks.append(heading(title, 'subheader'))
+            blocks.append(bullets([
+                f"{escape(issue['description'])} - Est. Cost: {_money(issue['estimated_cost'])}"
+                for issue in issues
+            ]))
+            blocks.append(spacer(12))
+
+    general_recs = """
+    <b>General Recommendations:</b><br/><br/>
+
+    1. <b>Professional Inspections:</b> Schedule detailed inspections for high-priority items<br/>
+    2. <b>Multiple Quotes:</b> Obtain quotes from multiple licensed contractors<br/>
+    3. <b>Permits:</b> Verify permit requirements for major improvements<br/>
+    4. <b>Insurance:</b> Check if improvements affect insurance coverage<br/>
+    5. <b>Market Analysis:</b> Research local market conditions before major investments<br/>
+    6. <b>Phased Approach:</b> Consider completing work in phases to spread costs<br/>
+    7. <b>Energy Efficiency:</b> Explore energy-efficient options that may qualify for rebates
+    """
+
+    footer_text = """
+    <b>Andrew and Kelli Contractors</b> - This report was generated using AI-powered drone photo analysis.
+    For questions about this report or to schedule additional analysis, please contact your
+    real estate professional.
+    """
+
+    blocks.extend([
+        paragraph(general_recs),
+        spacer(20),
+        paragraph(footer_text)
+    ])
+
+    return _section('recommendations', 'Recommendations', blocks)
+
+# Section builders in report order; each one starts on a new page in the PDF
+SECTION_BUILDERS = (
+    title_section,
+    executive_summary_section,
+    detailed_analysis_section,
+    cost_breakdown_section,
+    investment_analysis_section,
+    recommendations_section
+)
+
+def build_section(index, results):
+    """One section of the report, by position"""
+    return SECTION_BUILDERS[index](_ensure_summary(results))
+
+def iter_sections(results):
+    """Sections in report order, each built only when it is reached"""
+    results = _ensure_summary(results)
+    for builder in SECTION_BUILDERS:
+        yield builder(results)
+
+def build_report(results):
+    """The whole report as a dict of metadata and ordered sections"""
+    results = _ensure_summary(results)
+    return {
+        'model_version': MODEL_VERSION,
+        'session_id': results.get('session_id'),
+        'property_address': results.get('property_address'),
+        'generated_at': datetime.now().isoformat(),
+        'cost_table_version': results.get('cost_table_version'),
+        'sections': list(iter_sections(results))
+    }
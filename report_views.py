@@ -0,0 +1,60 @@
+"""Shareable HTML and JSON report routes, shared by both Flask apps.
+
+Reports are built with report_model from a session's saved results and
+are cacheable until those results change: the ETag carries the report
+model version and the results file's modification time.
+"""
+import json
+from flask import Blueprint, current_app, flash, make_response, redirect, render_template, request, url_for, jsonify
+from werkzeug.utils import secure_filename
+from session_results import load_results, results_mtime
+import report_model
+
+REPORT_MAX_AGE = 3600
+
+reports = Blueprint('reports', __name__)
+
+def _cacheable(response, etag):
+    """Let browsers and CDNs cache a report until the session's results change"""
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = REPORT_MAX_AGE
+    return response.make_conditional(request)
+
+def _report_etag(session_id, mtime):
+    return f'report-{report_model.MODEL_VERSION}-{session_id}-{int(mtime * 1000)}'
+
+@reports.route('/report/<session_id>')
+def html_report(session_id):
+    """Shareable HTML report built from the same sections as the PDF"""
+    session_id = secure_filename(session_id)
+    mtime = results_mtime(current_app.config['UPLOAD_FOLDER'], session_id)
+    analysis_results = load_results(current_app.config['UPLOAD_FOLDER'], session_id)
+    
+    if analysis_results is None:
+        flash('Analysis results not found')
+        return redirect(url_for('index'))
+    
+    etag = _report_etag(session_id, mtime)
+    if etag in request.if_none_match:
+        return _cacheable(current_app.response_class(), etag)
+    
+    report = report_model.build_report(analysis_results)
+    return _cacheable(make_response(render_template('report.html', report=report)), etag)
+
+@reports.route('/api/report/<session_id>')
+def json_report(session_id):
+    """Compact JSON form of the report sections"""
+    session_id = secure_filename(session_id)
+    mtime = results_mtime(current_app.config['UPLOAD_FOLDER'], session_id)
+    analysis_results = load_results(current_app.config['UPLOAD_FOLDER'], session_id)
+    
+    if analysis_results is None:
+        return jsonify({'error': 'Analysis results not found'}), 404
+    
+    etag = _report_etag(session_id, mtime)
+    if etag in request.if_none_match:
+        return _cacheable(current_app.response_class(mimetype='application/json'), etag)
+    
+    body = json.dumps(report_model.build_report(analysis_results), separators=(',', ':'))
+    return _cacheable(current_app.response_class(body, mimetype='application/json'), etag)
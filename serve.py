@@ -0,0 +1,368 @@
+"""Production server with preloaded, forked workers.
+
+    python serve.py [--app full|lite] [--host HOST] [--port PORT]
+                    [--workers N] [--max-requests N] [--analysis-processes N]
+
+The parent process imports the app and builds its analyzer and report
+generator, and with them OpenCV, NumPy and ReportLab. It moves those
+objects out of the garbage collector's reach and then forks every other
+process, so they all share the preloaded pages copy-on-write:
+
+- HTTP workers serve requests on threads from the one inherited listening
+  socket. Each exits after its request limit (with jitter, so workers do
+  not all restart together).
+- In the full build, analysis processes take analysis jobs from a shared
+  queue, so image analysis runs off the request threads. Each exits after
+  ANALYSIS_TASKS_PER_PROCESS jobs.
+
+A recycled worker stops accepting connections at once but lets requests
+it already holds, analyses included, run for up to GRACEFUL_TIMEOUT, and
+shuts down the report generator's process pool before it exits.
+
+The parent stays single-threaded and replaces any process that exits, so
+replacements are forked from the same clean, preloaded state and memory
+growth in one process is capped by its recycling limit.
+
+Settings default to SERVE_WORKERS, SERVE_MAX_REQUESTS, ANALYSIS_PROCESSES,
+HOST and PORT from the environment. Needs os.fork (Linux, macOS).
+"""
+import argparse
+import gc
+import itertools
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import weakref
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+from werkzeug.serving import make_server
+
+DEFAULT_WORKERS = int(os.environ.get('SERVE_WORKERS', 2))
+DEFAULT_MAX_REQUESTS = int(os.environ.get('SERVE_MAX_REQUESTS', 1000))
+MAX_REQUESTS_JITTER = 0.1  # Up to this fraction of the limit, per worker
+ANALYSIS_TASKS_PER_PROCESS = int(os.environ.get('ANALYSIS_TASKS_PER_PROCESS', 100))
+ANALYSIS_TIMEOUT = int(os.environ.get('ANALYSIS_TIMEOUT', 900))  # Seconds a request waits for its analysis
+GRACEFUL_TIMEOUT = ANALYSIS_TIMEOUT + 60  # Seconds a stopping worker waits for in-flight requests
+LISTEN_BACKLOG = 128
+RESPAWN_DELAY = 1.0  # Seconds before replacing a process that failed right away
+
+class RequestLimit:
+    """WSGI middleware that stops its worker's server after max_requests"""
+
+    def __init__(self, app, max_requests):
+        self.app = app
+        self.max_requests = max_requests
+        self.server = None
+        self._served = 0
+        self._lock = threading.Lock()
+        # Threads handling a request, each dropping out when it ends.
+        # Counting closed responses instead misses those werkzeug never
+        # closes, as when the client disconnects early.
+        self._running = weakref.WeakSet()
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self._served += 1
+            self._running.add(threading.current_thread())
+            if self.max_requests and self._served == self.max_requests:
+                self.stop()
+        return self.app(environ, start_response)
+
+    def stop(self):
+        """Stop accepting requests; callable from signal handlers"""
+        # shutdown() waits for serve_forever to return, so never call it
+        # on the thread running serve_forever
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    def wait_idle(self, timeout):
+        """Wait for requests in progress to finish; False if some are still running"""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            running = list(self._running)
+        for thread in running:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        return not any(thread.is_alive() for thread in running)
+
+def reply_address(reply_dir, pid):
+    """Unix socket an HTTP worker receives its analysis results on"""
+    return os.path.join(reply_dir, f'worker-{pid}.sock')
+
+class AnalysisQueue:
+    """An HTTP worker's handle on the analysis processes.
+
+    apply() blocks the calling request thread until an analysis process has
+    run func(*args). Each worker listens on its own reply socket, named in
+    every job it submits, so nothing a recycled worker leaves behind (such
+    as a lock held by a thread it never stopped) is shared with the worker
+    that replaces it.
+
+    The analysis process connects when it takes a job and keeps the
+    connection open until it replies, so if it dies mid-job the request
+    fails as soon as the connection closes rather than at the timeout.
+    """
+
+    def __init__(self, jobs, reply_dir):
+        self._jobs = jobs
+        self._address = reply_address(reply_dir, os.getpid())
+        self._listener = Listener(self._address, family='AF_UNIX')
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        threading.Thread(target=self._dispatch, daemon=True).start()
+
+    def apply(self, func, args):
+        job_id = next(self._ids)
+        future = Future()
+        with self._lock:
+            self._pending[job_id] = future
+        try:
+            self._jobs.put((self._address, job_id, func, args))
+            return future.result(ANALYSIS_TIMEOUT)
+        finally:
+            with self._lock:
+                self._pending.pop(job_id, None)
+
+    def _dispatch(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError as e:
+                print(f"Error accepting analysis connection: {e}")
+                continue
+            threading.Thread(target=self._receive, args=(conn,), daemon=True).start()
+
+    def _receive(self, conn):
+        with conn:
+            try:
+                job_id = conn.recv()
+            except (OSError, EOFError):
+                return
+            try:
+                ok, value = conn.recv()
+            except (OSError, EOFError):
+                ok, value = False, RuntimeError("Analysis process exited before finishing")
+        with self._lock:
+            future = self._pending.get(job_id)
+        # Results of requests that already timed out are dropped
+        if future is None:
+            return
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+def preload(app_name):
+    """Import the app and build its shared state before any fork"""
+    if app_name == 'full':
+        import app_full as module
+        module.warm_up()
+    else:
+        import app as module
+        try:
+            import report_generator  # The slim build serves PDFs only if ReportLab is present
+        except ImportError:
+            pass
+
+    import cost_tables
+    import regional_costs
+    cost_tables.current()
+    regional_costs.get_index()
+
+    # Objects that exist now are never collected; keeping the collector off
+    # them stops it from writing to, and so un-sharing, their pages
+    gc.collect()
+    gc.freeze()
+    return module
+
+def _serve(module, listener, host, port, max_requests, analysis_queue):
+    if analysis_queue is not None:
+        module.use_analysis_pool(analysis_queue)
+
+    limit = RequestLimit(module.app, max_requests)
+    server = make_server(host, port, limit, threaded=True, fd=listener.fileno())
+    limit.server = server
+    signal.signal(signal.SIGTERM, lambda signum, frame: limit.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: limit.stop())
+
+    try:
+        server.serve_forever()
+    finally:
+        if not limit.wait_idle(GRACEFUL_TIMEOUT):
+            print(f"Error stopping worker {os.getpid()}: requests still running after {GRACEFUL_TIMEOUT}s")
+        # os._exit skips interpreter shutdown, which would otherwise stop
+        # the pool's processes
+        report_generator = sys.modules.get('report_generator')
+        if report_generator is not None:
+            report_generator.shutdown_pool()
+
+def _run_job(address, job_id, func, args):
+    try:
+        conn = Client(address, family='AF_UNIX')
+    except OSError:
+        return  # The worker that asked has exited; nobody is waiting
+    with conn:
+        try:
+            conn.send(job_id)
+            try:
+                reply = (True, func(*args))
+            except Exception as e:
+                reply = (False, e)
+            try:
+                conn.send(reply)
+            except Exception as e:  # Results or exceptions that do not pickle
+                conn.send((False, RuntimeError(f"Analysis failed: {e}")))
+        except OSError:
+            pass  # The worker stopped waiting
+
+def _analyze_jobs(jobs, max_tasks):
+    # Stopped by the parent through the job queue, not by Ctrl-C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for _ in (range(max_tasks) if max_tasks else itertools.count()):
+        job = jobs.get()
+        if job is None:
+            break
+        _run_job(*job)
+
+def _fork(target, *args):
+    """Run target(*args) in a forked child that exits when it returns"""
+    pid = os.fork()
+    if pid:
+        return pid
+
+    status = 0
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        target(*args)
+    except BaseException:
+        traceback.print_exc()
+        status = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(status)
+
+def run(app_name, host, port, workers, max_requests, analysis_processes):
+    if not hasattr(os, 'fork'):
+        print("Error: serve.py needs os.fork; use app.run() or a WSGI server on this platform")
+        return 1
+
+    module = preload(app_name)
+
+    listener = socket.create_server((host, port), backlog=LISTEN_BACKLOG)
+    listener.set_inheritable(True)
+
+    # Created before any fork: one job queue shared by every process. Only
+    # analysis processes read from it, and they exit between jobs, never
+    # while holding its lock. Results go back over each HTTP worker's own
+    # socket in reply_dir.
+    context = multiprocessing.get_context('fork')
+    jobs = context.SimpleQueue() if analysis_processes else None
+    reply_dir = tempfile.mkdtemp(prefix='serve-') if analysis_processes else None
+
+    # Capacity set in the app is divided between the workers
+    if app_name == 'full':
+        config = module.app.config
+        slots = math.ceil(analysis_processes / workers) if analysis_processes else config['ANALYSIS_SLOTS'] // workers
+        config['ANALYSIS_SLOTS'] = max(1, slots)
+        config['ANALYSIS_MEMORY_BUDGET'] //= workers
+
+    children = {}  # pid -> (kind, slot, started)
+    stopping = False
+
+    def spawn(kind, slot):
+        if kind == 'http':
+            # Jitter is drawn here; forked children reseed random themselves
+            limit = max_requests + random.randint(0, int(max_requests * MAX_REQUESTS_JITTER)) if max_requests else 0
+
+            def target():
+                queue = AnalysisQueue(jobs, reply_dir) if analysis_processes else None
+                _serve(module, listener, host, port, limit, queue)
+            pid = _fork(target)
+        else:
+            pid = _fork(_analyze_jobs, jobs, ANALYSIS_TASKS_PER_PROCESS)
+        children[pid] = (kind, slot, time.monotonic())
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid, (kind, _, _) in list(children.items()):
+            if kind == 'http':
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(analysis_processes):
+        spawn('analysis', None)
+    for slot in range(workers):
+        spawn('http', slot)
+    print(f"Serving {app_name} build on http://{host}:{port} with {workers} workers "
+          f"and {analysis_processes} analysis processes")
+
+    released = False
+    while children:
+        # Analysis processes finish their current job once no worker is
+        # left to submit more
+        if stopping and not released and all(kind != 'http' for kind, _, _ in children.values()):
+            for _ in range(analysis_processes):
+                jobs.put(None)
+            released = True
+
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        entry = children.pop(pid, None)
+        if reply_dir is not None:
+            try:
+                os.unlink(reply_address(reply_dir, pid))
+            except FileNotFoundError:
+                pass
+        if stopping or entry is None:
+            continue
+
+        kind, slot, started = entry
+        if os.waitstatus_to_exitcode(status) != 0 and time.monotonic() - started < RESPAWN_DELAY:
+            time.sleep(RESPAWN_DELAY)
+        if not stopping:
+            spawn(kind, slot)
+
+    listener.close()
+    if reply_dir is not None:
+        shutil.rmtree(reply_dir, ignore_errors=True)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the drone analysis app with forked workers")
+    parser.add_argument('--app', choices=['full', 'lite'], default='full',
+                        help="full: app_full.py with OpenCV; lite: the Pillow-only app.py")
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8000)))
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--max-requests', type=int, default=DEFAULT_MAX_REQUESTS,
+                        help="requests per worker before it is replaced (0: never)")
+    parser.add_argument('--analysis-processes', type=int,
+                        default=int(os.environ.get('ANALYSIS_PROCESSES', os.cpu_count() or 1)),
+                        help="analysis processes in the full build (0: analyze on request threads)")
+    args = parser.parse_args(argv)
+
+    # The slim build analyzes straight from the upload stream
+    analysis_processes = max(0, args.analysis_processes) if args.app == 'full' else 0
+
+    return run(args.app, args.host, args.port, max(1, args.workers), args.max_requests, analysis_processes)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Stored analysis results and server-side issue queries.
+
+Both Flask apps save each session's results as analysis_results.json in
+the session's upload folder. The results page fetches its issues a page
+at a time through query_issues rather than rendering them all up front.
+"""
+import os
+import json
+from functools import lru_cache
+import analysis_rules as rules
+
+RESULTS_FILENAME = 'analysis_results.json'
+
+DEFAULT_PER_PAGE = 25
+MAX_PER_PAGE = 100
+
+SEVERITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+SORT_KEYS = {
+    'cost_desc': (lambda issue: -issue['estimated_cost']),
+    'cost_asc': (lambda issue: issue['estimated_cost']),
+    'severity': (lambda issue: (SEVERITY_ORDER.get(issue['severity'], 3), -issue['estimated_cost'])),
+    'confidence': (lambda issue: -issue['confidence'])
+}
+
+def results_path(upload_folder, session_id):
+    return os.path.join(upload_folder, session_id, RESULTS_FILENAME)
+
+def results_mtime(upload_folder, session_id):
+    """Modification time of a session's saved results, or None"""
+    try:
+        return os.path.getmtime(results_path(upload_folder, session_id))
+    except OSError:
+        return None
+
+def load_results(upload_folder, session_id):
+    """Load a session's results, or None if the session does not exist"""
+    mtime = results_mtime(upload_folder, session_id)
+    if mtime is None:
+        return None
+    return _load_cached(results_path(upload_folder, session_id), mtime)
+
+@lru_cache(maxsize=32)
+def _load_cached(path, mtime):
+    # Keyed on mtime so rewritten results are picked up; callers must not
+    # mutate the returned dict
+    with open(path, 'r') as f:
+        results = json.load(f)
+    # Sessions saved before summaries existed get theirs computed on load
+    if 'summary' not in results:
+        results['summary'] = rules.build_rollup(results.get('issues_found', []))
+    return results
+
+def _split_param(value):
+    return {part.strip().lower() for part in (value or '').split(',') if part.strip()}
+
+def query_issues(results, args):
+    """Filter, sort and paginate a session's issues.
+
+    args is a mapping of query parameters: severity and category accept
+    comma-separated values, q is a case-insensitive text search, sort is
+    one of SORT_KEYS, and page/per_page select the slice returned.
+    """
+    severities = _split_param(args.get('severity'))
+    categories = _split_param(args.get('category'))
+    text = (args.get('q') or '').strip().lower()
+    sort = args.get('sort') if args.get('sort') in SORT_KEYS else 'cost_desc'
+
+    try:
+        per_page = min(MAX_PER_PAGE, max(1, int(args.get('per_page', DEFAULT_PER_PAGE))))
+        page = max(1, int(args.get('page', 1)))
+    except (TypeError, ValueError):
+        per_page, page = DEFAULT_PER_PAGE, 1
+
+    matches = []
+    for index, issue in enumerate(results.get('issues_found', [])):
+        if severities and issue['severity'] not in severities:
+            continue
+        if categories and issue['category'] not in categories:
+            continue
+        if text and text not in issue['description'].lower() \
+                and text not in (issue.get('recommendation') or '').lower():
+            continue
+        matches.append((index, issue))
+
+    key = SORT_KEYS[sort]
+    matches.sort(key=lambda match: key(match[1]))
+
+    total = len(matches)
+    start = (page - 1) * per_page
+    page_issues = [dict(issue, id=index) for index, issue in matches[start:start + per_page]]
+
+    return {
+        'issues': page_issues,
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'total_pages': (total + per_page - 1) // per_page,
+        'sort': sort
+    }
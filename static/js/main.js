@@ -196,21 +196,30 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
-    // Add search functionality for issues (if needed)
+    // Issue search. Paginated results pages register PropertyScope.issueList
+    // and search on the server; otherwise filter the cards already on the page
     const searchInput = document.querySelector('#issueSearch');
     if (searchInput) {
+        let searchTimer = null;
         searchInput.addEventListener('input', function() {
-            const searchTerm = this.value.toLowerCase();
-            const issueItems = document.querySelectorAll('.issue-item');
-            
-            issueItems.forEach(item => {
-                const text = item.textContent.toLowerCase();
-                if (text.includes(searchTerm)) {
-                    item.style.display = 'block';
-                } else {
-                    item.style.display = 'none';
+            const searchTerm = this.value.trim();
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => {
+                if (PropertyScope.issueList) {
+                    PropertyScope.issueList.setQuery(searchTerm);
+                    return;
                 }
-            });
+
+                const issueItems = document.querySelectorAll('.issue-item');
+                issueItems.forEach(item => {
+                    const text = item.textContent.toLowerCase();
+                    if (text.includes(searchTerm.toLowerCase())) {
+                        item.style.display = 'block';
+                    } else {
+                        item.style.display = 'none';
+                    }
+                });
+            }, 250);
         });
     }
 });
@@ -0,0 +1,33 @@
+// PropertyScope - Photo downscaling worker
+//
+// Decodes a photo off the main thread, scales it so its longest side fits
+// the analysis resolution and re-encodes it as JPEG. Replies with a null
+// blob when the photo is already small enough to upload as-is.
+
+self.onmessage = async function(e) {
+    const { id, file, maxDimension, quality } = e.data;
+
+    try {
+        const bitmap = await createImageBitmap(file);
+        const scale = Math.min(1, maxDimension / Math.max(bitmap.width, bitmap.height));
+
+        if (scale === 1) {
+            bitmap.close();
+            self.postMessage({ id: id, blob: null });
+            return;
+        }
+
+        const width = Math.round(bitmap.width * scale);
+        const height = Math.round(bitmap.height * scale);
+        const canvas = new OffscreenCanvas(width, height);
+        const ctx = canvas.getContext('2d');
+        ctx.imageSmoothingQuality = 'high';
+        ctx.drawImage(bitmap, 0, 0, width, height);
+        bitmap.close();
+
+        const blob = await canvas.convertToBlob({ type: 'image/jpeg', quality: quality });
+        self.postMessage({ id: id, blob: blob });
+    } catch (err) {
+        self.postMessage({ id: id, error: err.message });
+    }
+};
@@ -0,0 +1,68 @@
+"""The full (OpenCV) and Vercel (Pillow) builds agree on the shared rules"""
+import os
+
+import cv2
+import numpy as np
+import pytest
+from PIL import ImageStat
+
+import analysis_rules as rules
+import cost_tables
+from lite_analyzer import LiteAnalyzer
+from property_analyzer import PropertyAnalyzer
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UNEVEN = 'Uneven roof surface indicating potential wear'
+
+@pytest.fixture(scope='module')
+def images(tmp_path_factory):
+    folder = tmp_path_factory.mktemp('parity')
+    rng = np.random.default_rng(0)
+    smooth = cv2.GaussianBlur((rng.random((1500, 2000, 3)) * 255).astype(np.uint8), (0, 0), 25)
+    # Coarse blocks, like shingles, are uneven at every scale
+    blocks = cv2.resize((rng.random((30, 40, 3)) * 255).astype(np.uint8), (2000, 1500),
+                        interpolation=cv2.INTER_NEAREST)
+    lawn = np.zeros((1200, 1600, 3), np.uint8)
+    lawn[:] = (40, 150, 60)
+    lawn[:, 900:] = (120, 120, 120)
+    paths = [os.path.join(REPO, 'drone-project-thesis.jpeg')]
+    for name, img in (('smooth', smooth), ('blocks', blocks), ('lawn', lawn)):
+        paths.append(str(folder / f'{name}.jpg'))
+        cv2.imwrite(paths[-1], img, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    return paths
+
+def _full_measures(analyzer, path):
+    img = cv2.imread(path)
+    with analyzer._buffers.lease() as lease:
+        texture = analyzer._texture_gray(img, lease)
+        enhanced = cv2.cvtColor(analyzer._enhance_image(img, lease), cv2.COLOR_BGR2HSV)
+        green = cv2.inRange(enhanced, np.array(rules.GREEN_HSV_LOWER), np.array(rules.GREEN_HSV_UPPER))
+        return float(texture.mean()), float(texture.std()), float((green > 0).mean())
+
+def _lite_measures(analyzer, path):
+    enhanced = analyzer._enhance_image(analyzer._load_proxy(path))
+    stats = ImageStat.Stat(enhanced.convert('L'))
+    return stats.mean[0], stats.stddev[0], analyzer._green_ratio(enhanced)
+
+def test_measures_agree(images):
+    full, lite = PropertyAnalyzer(), LiteAnalyzer()
+    for path in images:
+        full_mean, full_std, full_green = _full_measures(full, path)
+        lite_mean, lite_std, lite_green = _lite_measures(lite, path)
+        assert abs(full_mean - lite_mean) < 2, path
+        assert abs(full_std - lite_std) < 1.5, path
+        assert abs(full_green - lite_green) < 0.02, path
+
+def test_uneven_roof_rule_agrees(images):
+    full, lite = PropertyAnalyzer(), LiteAnalyzer()
+    table = cost_tables.current()
+    outcomes = []
+    for path in images:
+        full_issues = full._analyze_single_image(path, table, 'nadir')
+        lite_issues = lite._analyze_single_image(path, table, 'nadir')
+        full_uneven = any(issue['description'] == UNEVEN for issue in full_issues)
+        lite_uneven = any(issue['description'] == UNEVEN for issue in lite_issues)
+        assert full_uneven == lite_uneven, path
+        outcomes.append(full_uneven)
+    # The images exercise both sides of the threshold
+    assert True in outcomes and False in outcomes
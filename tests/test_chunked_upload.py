@@ -0,0 +1,38 @@
+"""Resumable chunked uploads in app_full.py"""
+import uuid
+
+import pytest
+
+import app_full
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setitem(app_full.app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    return app_full.app.test_client()
+
+@pytest.fixture
+def session_id(client):
+    return client.post('/upload/session').json['session_id']
+
+@pytest.mark.parametrize('session', ['.', '..', 'uploads', str(uuid.uuid4())])
+def test_sessions_not_opened_by_the_server_are_unknown(client, session):
+    assert client.get(f'/upload/{session}/files/roof.jpg').status_code == 404
+    assert client.put(f'/upload/{session}/files/roof.jpg?offset=0&total=3', data=b'abc').status_code == 404
+    assert client.post(f'/upload/{session}/complete').status_code == 404
+
+def test_file_is_assembled_from_chunks(client, session_id):
+    url = f'/upload/{session_id}/files/roof.jpg'
+    assert client.put(f'{url}?offset=0&total=6', data=b'abc').json == {'received': 3, 'complete': False}
+    assert client.put(f'{url}?offset=0&total=6', data=b'abc').status_code == 409
+    assert client.put(f'{url}?offset=3&total=6', data=b'def').json == {'received': 6, 'complete': True}
+    assert client.get(url).json == {'received': 6, 'complete': True}
+
+def test_names_that_sanitize_alike_are_rejected(client, session_id):
+    first = f'/upload/{session_id}/files/roof 1.jpg'
+    second = f'/upload/{session_id}/files/roof_1.jpg'
+    assert client.put(f'{first}?offset=0&total=3', data=b'abc').json['complete']
+    response = client.put(f'{second}?offset=0&total=3', data=b'xyz')
+    assert response.status_code == 400
+    assert 'roof_1.jpg' in response.json['error']
+    # The first file can still be resumed under its own name
+    assert client.get(first).json == {'received': 3, 'complete': True}
@@ -0,0 +1,45 @@
+"""Hot reloading of cost_tables.json"""
+import json
+import os
+
+import pytest
+
+import cost_tables
+
+@pytest.fixture
+def table_file(tmp_path, monkeypatch):
+    path = tmp_path / 'cost_tables.json'
+    with open(cost_tables.DEFAULT_PATH) as f:
+        path.write_text(f.read())
+    monkeypatch.setattr(cost_tables, 'DEFAULT_PATH', str(path))
+    monkeypatch.setattr(cost_tables, '_current', None)
+    monkeypatch.setattr(cost_tables, '_current_mtime', None)
+    monkeypatch.setattr(cost_tables, '_current_digest', None)
+    return path
+
+def _edit(path, version=None):
+    config = json.loads(path.read_text())
+    config['issues']['roof_dark_areas'][0]['max'] += 1000
+    if version is not None:
+        config['version'] = version
+    path.write_text(json.dumps(config))
+    # The reload check compares mtimes, which may not tick within a test
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+def _roof_max(table):
+    return table.issues['roof_dark_areas'][0]['cost_range']['max']
+
+def test_edit_without_version_bump_is_refused(table_file, capsys):
+    before = cost_tables.reload()
+    _edit(table_file)
+    after = cost_tables.reload()
+    assert after is before
+    assert 'version' in capsys.readouterr().out
+
+def test_edit_with_version_bump_is_applied(table_file):
+    before = cost_tables.reload()
+    _edit(table_file, version='test-2')
+    after = cost_tables.reload()
+    assert after.version == 'test-2'
+    assert _roof_max(after) == _roof_max(before) + 1000
@@ -0,0 +1,35 @@
+"""Near-duplicate grouping in frame_dedup"""
+import io
+
+import cv2
+import numpy as np
+
+import frame_dedup
+
+def _jpeg(img):
+    return io.BytesIO(cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes())
+
+def _flat(color, rng):
+    img = np.empty((600, 800, 3), np.uint8)
+    img[:] = color
+    return cv2.add(img, rng.normal(0, 3, img.shape).clip(0, 255).astype(np.uint8))
+
+def test_featureless_frames_are_never_grouped():
+    rng = np.random.default_rng(0)
+    # Sky, overexposed, bare siding, shadowed wall, pale render, dusk
+    colors = [(235, 206, 135), (250, 250, 250), (180, 180, 170), (60, 90, 140), (200, 200, 200), (30, 30, 30)]
+    frames = [_jpeg(_flat(color, rng)) for color in colors]
+    assert frame_dedup.cluster_frames(frames) == [[index] for index in range(len(colors))]
+
+def test_gradients_of_different_scenes_are_not_grouped():
+    ramp = np.linspace(0, 1, 800)[None, :, None]
+    sky = np.broadcast_to(120 + ramp * 130, (600, 800, 3)).astype(np.uint8)
+    wall = np.broadcast_to(20 + ramp * 130, (600, 800, 3)).astype(np.uint8)
+    assert frame_dedup.cluster_frames([_jpeg(sky), _jpeg(wall)]) == [[0], [1]]
+
+def test_overlapping_frames_are_grouped():
+    rng = np.random.default_rng(0)
+    scene = cv2.resize((rng.random((30, 40, 3)) * 255).astype(np.uint8), (820, 620), interpolation=cv2.INTER_CUBIC)
+    other = cv2.resize((rng.random((30, 40, 3)) * 255).astype(np.uint8), (800, 600), interpolation=cv2.INTER_CUBIC)
+    frames = [_jpeg(scene[:600, :800]), _jpeg(other), _jpeg(scene[8:608, 6:806])]
+    assert frame_dedup.cluster_frames(frames) == [[0, 2], [1]]
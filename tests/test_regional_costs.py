@@ -0,0 +1,35 @@
+"""Region lookups in the shipped regional_costs.json"""
+import pytest
+
+import regional_costs
+
+@pytest.mark.parametrize('address, region', [
+    ('1 Main St, Los Angeles, CA 90012', 'LAMETRO'),
+    ('200 Tulare St, Fresno, CA 93701', 'CA'),
+    ('5 Royal St, New Orleans, LA 70112', 'LA'),
+    ('Baton Rouge, LA', 'LA'),
+    ('350 5th Ave, New York, NY 10118', 'NYC'),
+    ('Somewhere without a state', None),
+    # House numbers are not ZIPs, and the named state wins
+    ('10250 Preston Rd, Dallas, TX', 'TX'),
+    ('48000 Main St, Austin, Texas', 'TX'),
+    # Street suffixes and directions are not state codes
+    ('12 Oak CT, Springfield', None),
+    ('100 Peachtree St NE, Atlanta', None),
+])
+def test_locate(address, region):
+    assert regional_costs.locate(address)['region'] == region
+
+def test_state_wins_over_a_zip_from_another_state():
+    region = regional_costs.locate('Dallas, TX 10118')
+    assert (region['region'], region['source']) == ('TX', 'state')
+
+def test_metro_keyed_like_a_state_code_is_rejected():
+    config = {
+        'version': 'test',
+        'default': {'name': 'National average', 'labor': 1.0, 'material': 1.0},
+        'labor_share': {category: 0.5 for category in regional_costs.COST_CATEGORIES},
+        'regions': {'LA': {'name': 'Los Angeles metro', 'state': 'CA', 'labor': 1.3, 'material': 1.08}}
+    }
+    with pytest.raises(ValueError):
+        regional_costs.RegionalIndex(config)
@@ -0,0 +1,80 @@
+"""End-to-end checks of serve.py's prefork server"""
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+import cv2
+import numpy as np
+import pytest
+
+import serve
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason="serve.py needs os.fork")
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _wait_until_up(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        assert process.poll() is None, "server exited during startup"
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/admission', timeout=5):
+                return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise AssertionError("server did not come up")
+
+def _post_image(port, image, timeout):
+    boundary = uuid.uuid4().hex
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="roof.jpg"\r\n'
+            f'Content-Type: image/jpeg\r\n\r\n').encode() + image + f'\r\n--{boundary}--\r\n'.encode()
+    request = urllib.request.Request(f'http://127.0.0.1:{port}/api/analyze', data=body, method='POST',
+                                     headers={'Content-Type': f'multipart/form-data; boundary={boundary}'})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status
+
+def test_analyses_survive_worker_recycling(tmp_path):
+    rng = np.random.default_rng(0)
+    image = cv2.imencode('.jpg', (rng.random((240, 320, 3)) * 255).astype(np.uint8))[1].tobytes()
+
+    port = _free_port()
+    env = dict(os.environ, ANALYSIS_TIMEOUT='20')
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(REPO, 'serve.py'), '--host', '127.0.0.1', '--port', str(port),
+         '--workers', '1', '--max-requests', '2', '--analysis-processes', '1'],
+        cwd=tmp_path, env=env, start_new_session=True)
+    try:
+        _wait_until_up(port, process)
+        # The startup probe is request 1, so the worker is replaced more
+        # than once across these analyses
+        for _ in range(5):
+            assert _post_image(port, image, timeout=30) == 200
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+
+def test_crashed_analysis_fails_its_request_at_once(tmp_path):
+    jobs = multiprocessing.SimpleQueue()
+    queue = serve.AnalysisQueue(jobs, str(tmp_path))
+    process = multiprocessing.get_context('fork').Process(target=serve._analyze_jobs, args=(jobs, 1))
+    process.start()
+    try:
+        started = time.monotonic()
+        # The analysis process dies mid-job, as a segfault in OpenCV would
+        with pytest.raises(RuntimeError):
+            queue.apply(os._exit, (1,))
+        assert time.monotonic() - started < 10
+    finally:
+        process.join(timeout=10)
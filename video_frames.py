@@ -0,0 +1,139 @@
+"""Keyframe sampling for drone flyover videos.
+
+cv2.VideoCapture decodes the uploaded file from disk one frame at a time,
+so a video is never held in memory. Every SAMPLE_INTERVAL seconds one frame
+becomes a candidate and is scored on a small grayscale proxy: candidates
+whose Laplacian variance is below BLUR_THRESHOLD are motion-blurred, and
+candidates whose mean absolute difference from the last keyframe is below
+MIN_NOVELTY show nothing new. The rest are keyframes.
+
+prefetch() runs a sampler in a producer thread feeding a bounded queue, so
+the next keyframe is decoded while the current one is analyzed. OpenCV
+releases the GIL while decoding and in the detectors, so the two overlap.
+"""
+import os
+import queue
+import threading
+import cv2
+
+SAMPLE_INTERVAL = 0.5  # Seconds between candidate frames
+PROXY_WIDTH = 320  # Width of the grayscale proxy candidates are scored on
+BLUR_THRESHOLD = 50.0  # Minimum Laplacian variance of a sharp proxy
+MIN_NOVELTY = 12.0  # Minimum mean absolute difference (0-255) from the last keyframe
+MAX_KEYFRAMES = 120  # Per video
+PREFETCH_DEPTH = 4  # Keyframes decoded ahead of the analyzer
+
+def _proxy(frame):
+    height, width = frame.shape[:2]
+    scale = PROXY_WIDTH / width
+    small = cv2.resize(frame, (PROXY_WIDTH, max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+def _limit_size(frame, max_dimension):
+    height, width = frame.shape[:2]
+    if not max_dimension or max(height, width) <= max_dimension:
+        return frame
+    scale = max_dimension / max(height, width)
+    return cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+class KeyframeSampler:
+    """Iterable of (name, BGR frame) keyframes of one video file.
+
+    stats counts decoded frames, candidates, and candidates skipped as
+    blurred or redundant; it is complete once iteration ends.
+    """
+
+    def __init__(self, path, max_dimension=None, max_keyframes=MAX_KEYFRAMES):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.max_dimension = max_dimension
+        self.max_keyframes = max_keyframes
+        self.stats = {'name': self.name, 'frames_decoded': 0, 'candidates': 0,
+                      'blurred': 0, 'redundant': 0, 'keyframes': 0, 'duration_seconds': 0.0}
+
+    def __iter__(self):
+        capture = cv2.VideoCapture(self.path)
+        if not capture.isOpened():
+            print(f"Error opening video {self.path}")
+            return
+
+        try:
+            fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+            step = max(1, int(round(fps * SAMPLE_INTERVAL)))
+            last_keyframe = None
+            index = -1
+
+            while self.stats['keyframes'] < self.max_keyframes:
+                # grab() advances without converting the frame; only
+                # candidates are retrieved as BGR images
+                if not capture.grab():
+                    break
+                index += 1
+                self.stats['frames_decoded'] = index + 1
+                if index % step:
+                    continue
+
+                ok, frame = capture.retrieve()
+                if not ok:
+                    break
+                self.stats['candidates'] += 1
+
+                proxy = _proxy(frame)
+                if cv2.Laplacian(proxy, cv2.CV_64F).var() < BLUR_THRESHOLD:
+                    self.stats['blurred'] += 1
+                    continue
+                if last_keyframe is not None and cv2.absdiff(proxy, last_keyframe).mean() < MIN_NOVELTY:
+                    self.stats['redundant'] += 1
+                    continue
+
+                last_keyframe = proxy
+                self.stats['keyframes'] += 1
+                yield f"{self.name}@{index / fps:.1f}s", _limit_size(frame, self.max_dimension)
+
+            self.stats['duration_seconds'] = round((index + 1) / fps, 1)
+        finally:
+            capture.release()
+
+def prefetch(items, depth=PREFETCH_DEPTH):
+    """Iterate items produced by a background thread, at most depth ahead.
+
+    Closing the returned generator early stops the producer and closes the
+    underlying iterator (releasing the video capture).
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not put(item):
+                    break
+        except Exception as e:
+            print(f"Error decoding video frames: {e}")
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+            put(done)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+        producer.join()